@@ -9,7 +9,9 @@ from app.api.v1.endpoints import (
     access,
     comparison,
     auth,
-    prediction
+    prediction,
+    models,
+    system
 )
 
 api_router = APIRouter()
@@ -24,3 +26,5 @@ api_router.include_router(explain.router, prefix="/explain", tags=["explain"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(access.router, prefix="/access", tags=["access"])
 api_router.include_router(comparison.router, prefix="/comparison", tags=["comparison"])
+api_router.include_router(models.router, prefix="/models", tags=["models"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from typing import List
 from app.models import RiskTrend, PredictionAccuracy, ZoneActivity, SystemStatus
 from app.db.session import get_database
+from app.api.v1.pagination import PageParams, paginate
+from app.utils.snapshot_store import snapshot_store
 
 router = APIRouter()
 
@@ -16,16 +18,28 @@ async def get_system_status(db = Depends(get_database)):
     }
 
 @router.get("/risk-trend", response_model=List[RiskTrend])
-async def get_risk_trend(db = Depends(get_database)):
-    cursor = db.risk_trends.find({}, {"_id": 0})
-    return await cursor.to_list(length=100)
+async def get_risk_trend(request: Request, response: Response, page: PageParams = Depends(), db = Depends(get_database)):
+    list_page = lambda r: paginate(db.risk_trends, {}, page, r)
+    if page.is_default:
+        return await snapshot_store.serve(request, ("analytics", "risk-trend"), List[RiskTrend], list_page)
+    return await list_page(response)
 
 @router.get("/accuracy", response_model=List[PredictionAccuracy])
-async def get_prediction_accuracy(db = Depends(get_database)):
-    cursor = db.prediction_accuracy.find({}, {"_id": 0})
-    return await cursor.to_list(length=100)
+async def get_prediction_accuracy(request: Request, response: Response, page: PageParams = Depends(), db = Depends(get_database)):
+    list_page = lambda r: paginate(db.prediction_accuracy, {}, page, r)
+    if page.is_default:
+        return await snapshot_store.serve(request, ("analytics", "accuracy"), List[PredictionAccuracy], list_page)
+    return await list_page(response)
 
 @router.get("/zone-activity", response_model=List[ZoneActivity])
-async def get_zone_activity(db = Depends(get_database)):
-    cursor = db.zone_activity.find({}, {"_id": 0})
-    return await cursor.to_list(length=100)
+async def get_zone_activity(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db = Depends(get_database),
+    sort: str = Query("_id", pattern="^(_id|-?incidents)$", description="_id (insertion order) or incidents; prefix with - for descending"),
+):
+    list_page = lambda r: paginate(db.zone_activity, {}, page, r, sort)
+    if page.is_default:
+        return await snapshot_store.serve(request, ("analytics", f"zone-activity:{sort}"), List[ZoneActivity], list_page)
+    return await list_page(response)
@@ -12,6 +12,10 @@ from app.db.session import get_database
 SECRET_KEY = os.getenv("SECRET_KEY", "yoursecretkeyhereforpronezonepredictor")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# Who may change server-wide state such as the active model version:
+# users with one of these roles, plus the usernames listed explicitly
+OPERATOR_ROLES = {r.strip() for r in os.getenv("OPERATOR_ROLES", "admin,operator").split(",") if r.strip()}
+OPERATOR_USERS = {u.strip() for u in os.getenv("OPERATOR_USERS", "admin").split(",") if u.strip()}
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
@@ -53,6 +57,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db = Depends(get
         raise credentials_exception
     return User(**user)
 
+async def get_current_operator(current_user: User = Depends(get_current_user)):
+    """
+    Like get_current_user, but only for enabled admins/operators.
+    """
+    allowed = current_user.role in OPERATOR_ROLES or current_user.username in OPERATOR_USERS
+    if current_user.disabled or not allowed:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operator access required")
+    return current_user
+
 @router.post("/login", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db = Depends(get_database)):
     user_dict = await db.users.find_one({"username": form_data.username})
@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from typing import List
 from app.models import FeatureImportance, PredictionBreakdown, ModelMetric
 from app.db.session import get_database
 from app.utils.prediction import model_handler
+from app.utils.snapshot_store import snapshot_store
 
 router = APIRouter()
 
-@router.get("/feature-importance", response_model=List[FeatureImportance])
-async def get_feature_importance(db = Depends(get_database)):
+async def load_feature_importance(db):
     # Try to get from model first
     model_importance = model_handler.get_feature_importance()
     if model_importance:
@@ -29,8 +29,7 @@ async def get_feature_importance(db = Depends(get_database)):
         {"feature": "Humidity Levels", "importance": 71, "color": "#00ff87"},
     ]
 
-@router.get("/prediction-breakdown", response_model=List[PredictionBreakdown])
-async def get_prediction_breakdown(db = Depends(get_database)):
+async def load_prediction_breakdown(db):
     try:
         cursor = db.prediction_breakdowns.find({}, {"_id": 0})
         result = await cursor.to_list(length=100)
@@ -53,8 +52,7 @@ async def get_prediction_breakdown(db = Depends(get_database)):
         },
     ]
 
-@router.get("/model-metrics", response_model=List[ModelMetric])
-async def get_model_metrics(db = Depends(get_database)):
+async def load_model_metrics(db):
     try:
         cursor = db.model_metrics.find({}, {"_id": 0})
         result = await cursor.to_list(length=100)
@@ -69,3 +67,19 @@ async def get_model_metrics(db = Depends(get_database)):
         {"metric": "F1-Score", "score": 89.9},
         {"metric": "Accuracy", "score": 87.3},
     ]
+
+# Served pre-encoded; model swaps invalidate the "explain" group
+@router.get("/feature-importance", response_model=List[FeatureImportance])
+async def get_feature_importance(request: Request, db = Depends(get_database)):
+    return await snapshot_store.serve(request, ("explain", "feature-importance"), List[FeatureImportance],
+                                      lambda r: load_feature_importance(db))
+
+@router.get("/prediction-breakdown", response_model=List[PredictionBreakdown])
+async def get_prediction_breakdown(request: Request, db = Depends(get_database)):
+    return await snapshot_store.serve(request, ("explain", "prediction-breakdown"), List[PredictionBreakdown],
+                                      lambda r: load_prediction_breakdown(db))
+
+@router.get("/model-metrics", response_model=List[ModelMetric])
+async def get_model_metrics(request: Request, db = Depends(get_database)):
+    return await snapshot_store.serve(request, ("explain", "model-metrics"), List[ModelMetric],
+                                      lambda r: load_model_metrics(db))
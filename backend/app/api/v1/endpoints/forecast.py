@@ -1,54 +1,66 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import List
 from app.models import Forecast24h, Forecast3day, Forecast7day
-from app.db.session import get_database
-from app.utils.forecast_service import update_forecasts
+from app.utils.forecast_service import (
+    FORECAST_MAX_AGE_SECONDS,
+    FORECAST_RETRY_COOLDOWN_SECONDS,
+    get_forecast_snapshot,
+    get_snapshot_age,
+    schedule_forecast_refresh,
+)
+from app.utils.scheduler import refresh_scheduler
+from app.utils.snapshot_store import snapshot_store
 
 router = APIRouter()
 
+async def build_forecast_snapshot(horizon: str, response: Response):
+    snapshot = await get_forecast_snapshot(horizon)
+    age = get_snapshot_age(snapshot["updatedAt"])
+    if age is not None:
+        response.headers["Age"] = str(age)
+    if snapshot["version"] is not None:
+        response.headers["X-Forecast-Version"] = str(snapshot["version"])
+    return snapshot["items"]
+
+async def serve_forecast_snapshot(horizon: str, request: Request, response_model) -> Response:
+    """
+    Return the current forecast snapshot immediately, pre-encoded until the
+    next publish. Missing or stale snapshots schedule a single background
+    refresh instead of blocking, unless the last one failed recently.
+    """
+    snapshot = await snapshot_store.get(
+        ("forecast", horizon),
+        response_model,
+        lambda r: build_forecast_snapshot(horizon, r),
+        # Keep asking Mongo until the first snapshot has been published
+        cacheable=lambda s: "x-forecast-version" in s.headers,
+    )
+
+    age = snapshot.age()
+    stale = "x-forecast-version" not in snapshot.headers or age is None or age > FORECAST_MAX_AGE_SECONDS
+    if stale and not refresh_scheduler.jobs["forecasts"].failed_within(FORECAST_RETRY_COOLDOWN_SECONDS):
+        schedule_forecast_refresh()
+    return snapshot.response(request, {"X-Forecast-Stale": "true" if stale else "false"})
+
 @router.get("/24h", response_model=List[Forecast24h])
-async def get_forecast_24h(db = Depends(get_database)):
-    cursor = db.forecasts_24h.find({}, {"_id": 0})
-    result = await cursor.to_list(length=100)
-    if result:
-        return result
-    
-    # If no data in DB, try to update
-    await update_forecasts()
-    cursor = db.forecasts_24h.find({}, {"_id": 0})
-    result = await cursor.to_list(length=100)
-    return result if result else []
+async def get_forecast_24h(request: Request):
+    return await serve_forecast_snapshot("24h", request, List[Forecast24h])
 
 @router.get("/3day", response_model=List[Forecast3day])
-async def get_forecast_3day(db = Depends(get_database)):
-    cursor = db.forecasts_3day.find({}, {"_id": 0})
-    result = await cursor.to_list(length=100)
-    if result:
-        return result
-
-    # If no data in DB, try to update
-    await update_forecasts()
-    cursor = db.forecasts_3day.find({}, {"_id": 0})
-    result = await cursor.to_list(length=100)
-    return result if result else []
+async def get_forecast_3day(request: Request):
+    return await serve_forecast_snapshot("3day", request, List[Forecast3day])
 
 @router.get("/7day", response_model=List[Forecast7day])
-async def get_forecast_7day(db = Depends(get_database)):
-    cursor = db.forecasts_7day.find({}, {"_id": 0})
-    result = await cursor.to_list(length=100)
-    if result:
-        return result
-
-    # If no data in DB, try to update
-    await update_forecasts()
-    cursor = db.forecasts_7day.find({}, {"_id": 0})
-    result = await cursor.to_list(length=100)
-    return result if result else []
+async def get_forecast_7day(request: Request):
+    return await serve_forecast_snapshot("7day", request, List[Forecast7day])
 
 @router.post("/refresh")
 async def refresh_forecasts():
     try:
-        await update_forecasts()
+        # Joins an in-flight refresh rather than starting a second one
+        if not await asyncio.shield(schedule_forecast_refresh()):
+            raise Exception(refresh_scheduler.jobs["forecasts"].last_error or "Forecast refresh failed")
         return {"message": "Forecasts updated successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,17 +1,19 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Optional
 from app.models import HistoricalData, HistoricalEvent
 from app.db.session import get_database
+from app.api.v1.pagination import PageParams, paginate
 
 router = APIRouter()
 
 @router.get("/data", response_model=List[HistoricalData])
-async def get_historical_data(db = Depends(get_database)):
+async def get_historical_data(response: Response, page: PageParams = Depends(), db = Depends(get_database)):
     try:
-        cursor = db.historical_data.find({}, {"_id": 0})
-        result = await cursor.to_list(length=100)
-        if result:
+        result = await paginate(db.historical_data, {}, page, response)
+        if result or page.after is not None:
             return result
+    except HTTPException:
+        raise
     except Exception:
         pass
 
@@ -25,12 +27,25 @@ async def get_historical_data(db = Depends(get_database)):
     ]
 
 @router.get("/events", response_model=List[HistoricalEvent])
-async def get_historical_events(db = Depends(get_database)):
+async def get_historical_events(
+    response: Response,
+    page: PageParams = Depends(),
+    db = Depends(get_database),
+    zone: Optional[str] = None,
+    risk_level: Optional[str] = Query(None, alias="riskLevel"),
+):
+    query = {}
+    if zone is not None:
+        query["zone"] = zone
+    if risk_level is not None:
+        query["riskLevel"] = risk_level
     try:
-        cursor = db.historical_events.find({}, {"_id": 0})
-        result = await cursor.to_list(length=100)
-        if result:
+        result = await paginate(db.historical_events, query, page, response)
+        # Only an empty collection falls back to the sample events
+        if result or page.after is not None or query:
             return result
+    except HTTPException:
+        raise
     except Exception:
         pass
 
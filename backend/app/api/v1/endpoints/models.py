@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from app.models import User, ModelVersion
+from app.api.v1.endpoints.auth import get_current_operator, get_current_user
+from app.utils.model_registry import (
+    ModelValidationError,
+    activate_version,
+    list_versions,
+    rollback_version,
+)
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ModelVersion])
+async def get_model_versions(current_user: User = Depends(get_current_user)):
+    return list_versions()
+
+@router.post("/{version}/activate")
+async def activate_model_version(version: str, current_user: User = Depends(get_current_operator)):
+    """
+    Load, validate and hot-swap to the given model version.
+    """
+    try:
+        return await activate_version(version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/rollback")
+async def rollback_model_version(current_user: User = Depends(get_current_operator)):
+    """
+    Switch back to the previously active model version.
+    """
+    try:
+        return await rollback_version()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,16 +1,73 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.prediction import PredictionInput, PredictionOutput
-from app.utils.prediction import model_handler
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+import numpy as np
+from app.schemas.prediction import (
+    PredictionInput,
+    PredictionOutput,
+    BatchPredictionInput,
+    BatchPredictionOutput,
+)
+from app.utils.prediction import FEATURES
+from app.utils.inference_executor import inference_executor, InferenceOverloaded
+from app.utils.micro_batcher import prediction_batcher
+from app.utils.bulk_scoring import (
+    BULK_FORMATS,
+    BulkFormatError,
+    DuplexStreamingResponse,
+    detect_format,
+    score_stream,
+)
 
 router = APIRouter()
 
+def _overloaded(e: InferenceOverloaded) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
 @router.post("/", response_model=PredictionOutput)
 async def predict_risk(data: PredictionInput):
     try:
-        prediction, confidence = model_handler.predict(data.dict())
+        # Concurrent requests are scored together; the version is the bundle that actually ran
+        prediction, confidence, version = await prediction_batcher.predict(data.dict())
         return {
-            "risk_level": prediction,
-            "confidence": confidence
+            "risk_level": str(prediction),
+            "confidence": confidence,
+            "model_version": version
         }
+    except InferenceOverloaded as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch", response_model=BatchPredictionOutput)
+async def predict_risk_batch(data: BatchPredictionInput):
+    try:
+        matrix = np.array(
+            [[getattr(item, f) for f in FEATURES] for item in data.items],
+            dtype=np.float64,
+        ).reshape(-1, len(FEATURES))
+        labels, confidences, version = await inference_executor.predict_many(matrix)
+        return {
+            "predictions": [
+                {"risk_level": str(label), "confidence": float(conf), "model_version": version}
+                for label, conf in zip(labels, confidences)
+            ],
+            "model_version": version
+        }
+    except InferenceOverloaded as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream")
+async def predict_risk_stream(request: Request, format: Optional[str] = None):
+    """
+    Bulk scoring for backfills. The body is NDJSON (one PredictionInput
+    object per line) or CSV with a header naming the feature columns,
+    picked from ?format= or the Content-Type. Results stream back in the
+    same format, one line per input row, as each block is scored.
+    """
+    try:
+        fmt = detect_format(request.headers.get("content-type"), format)
+    except BulkFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return DuplexStreamingResponse(score_stream(request.stream(), fmt), media_type=BULK_FORMATS[fmt])
@@ -1,15 +1,15 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, Query, Response
+from typing import List, Optional
 from app.models import Report, Insight
 from app.db.session import get_database
+from app.api.v1.pagination import PageParams, paginate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Report])
-async def get_reports(db = Depends(get_database)):
-    cursor = db.reports.find({}, {"_id": 0})
-    result = await cursor.to_list(length=100)
-    if not result:
+async def get_reports(response: Response, page: PageParams = Depends(), db = Depends(get_database)):
+    result = await paginate(db.reports, {}, page, response)
+    if not result and page.after is None:
         return [
             {
                 "title": "Monthly Risk Assessment Report",
@@ -24,10 +24,22 @@ async def get_reports(db = Depends(get_database)):
     return result
 
 @router.get("/insights", response_model=List[Insight])
-async def get_insights(db = Depends(get_database)):
-    cursor = db.insights.find({}, {"_id": 0})
-    result = await cursor.to_list(length=100)
-    if not result:
+async def get_insights(
+    response: Response,
+    page: PageParams = Depends(),
+    db = Depends(get_database),
+    severity: Optional[str] = None,
+    min_confidence: Optional[int] = Query(None, alias="minConfidence", ge=0, le=100),
+    sort: str = Query("_id", pattern="^(_id|-?confidence)$", description="_id (insertion order) or confidence; prefix with - for descending"),
+):
+    query = {}
+    if severity is not None:
+        query["severity"] = severity
+    if min_confidence is not None:
+        query["confidence"] = {"$gte": min_confidence}
+    result = await paginate(db.insights, query, page, response, sort)
+    # Only an empty collection falls back to the sample insight
+    if not result and page.after is None and not query:
         return [
             {
                 "title": "Seismic Activity Surge",
@@ -1,30 +1,122 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple
 from app.models import RiskZone, User
 from app.db.session import get_database
+from app.api.v1.pagination import PageParams, paginate, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
 from app.api.v1.endpoints.auth import get_current_user
-from app.utils.forecast_service import update_risk_zones
+from app.utils.forecast_service import schedule_risk_zone_refresh, publish_zone_changes
+from app.utils.zone_catalog import delete_catalog_zone, ensure_zone_catalog, upsert_catalog_zone
+from app.utils.snapshot_store import snapshot_store
+from app.utils.broadcaster import zone_broadcaster, TooManySubscribers
 import datetime
+import math
 
 router = APIRouter()
 
 @router.post("/refresh")
 async def refresh_risk_data(
-    background_tasks: BackgroundTasks,
     db = Depends(get_database),
     current_user: User = Depends(get_current_user)
 ):
     """
     Trigger a refresh of risk zone data from external APIs.
     """
-    background_tasks.add_task(update_risk_zones)
+    schedule_risk_zone_refresh()
     return {"message": "Data refresh started in background"}
 
+LAT_RANGE = (-90.0, 90.0)
+LNG_RANGE = (-180.0, 180.0)
+
+def _parse_numbers(value: str, name: str, ranges: List[Tuple[float, float]]) -> List[float]:
+    """
+    Parse one comma-separated number per entry of `ranges`, each within its
+    (min, max) range; anything else, including nan/inf, is a 400.
+    """
+    try:
+        numbers = [float(part) for part in value.split(",")]
+    except ValueError:
+        numbers = []
+    if len(numbers) != len(ranges) or not all(math.isfinite(n) for n in numbers):
+        raise HTTPException(status_code=400, detail=f"{name} must be {len(ranges)} comma-separated numbers")
+    for n, (low, high) in zip(numbers, ranges):
+        if not low <= n <= high:
+            raise HTTPException(status_code=400, detail=f"{name} value {n} is outside [{low:g}, {high:g}]")
+    return numbers
+
+RISK_ZONE_SORTS = "^-?(id|zone|confidence)$"
+
 @router.get("/", response_model=List[RiskZone])
-async def get_risk_zones(db = Depends(get_database)):
-    cursor = db.risk_zones.find({}, {"_id": 0})
-    zones = await cursor.to_list(length=100)
-    return zones
+async def get_risk_zones(
+    request: Request,
+    response: Response,
+    db = Depends(get_database),
+    bbox: Optional[str] = Query(None, description="west,south,east,north in degrees"),
+    near: Optional[str] = Query(None, description="lat,lng in degrees; nearest zones first"),
+    limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT,
+                                 description=f"page size (default {PAGE_DEFAULT_LIMIT}), or max zones returned with near (default 10)"),
+    after: Optional[str] = Query(None, description="cursor from the previous page's X-Next-Cursor header"),
+    radius_km: Optional[float] = Query(None, gt=0, description="max distance with near"),
+    risk_level: Optional[str] = Query(None, alias="riskLevel"),
+    min_confidence: Optional[int] = Query(None, alias="minConfidence", ge=0, le=100),
+    sort: str = Query("id", pattern=RISK_ZONE_SORTS, description="id, zone or confidence; prefix with - for descending"),
+):
+    """
+    Risk zones a page at a time, or only those inside `bbox` or closest to
+    `near`, resolved through the in-memory zone catalog index.
+    """
+    query = {}
+    if risk_level is not None:
+        query["riskLevel"] = risk_level
+    if min_confidence is not None:
+        query["confidence"] = {"$gte": min_confidence}
+
+    if bbox is None and near is None:
+        page = PageParams(limit or PAGE_DEFAULT_LIMIT, after)
+        list_page = lambda r: paginate(db.risk_zones, query, page, r, sort, unique=("id",))
+        if page.is_default and not query and sort == "id":
+            # The dashboard's view: encoded once per refresh instead of per request
+            return await snapshot_store.serve(request, ("risk-zones", "default"), List[RiskZone], list_page)
+        return await list_page(response)
+
+    catalog = await ensure_zone_catalog()
+    if near is not None:
+        lat, lng = _parse_numbers(near, "near", [LAT_RANGE, LNG_RANGE])
+        matches = [zone for zone, _ in catalog.nearest(lat, lng, k=limit or 10, radius_km=radius_km)]
+    else:
+        west, south, east, north = _parse_numbers(bbox, "bbox", [LNG_RANGE, LAT_RANGE, LNG_RANGE, LAT_RANGE])
+        if south > north:
+            raise HTTPException(status_code=400, detail="bbox south must not be greater than north")
+        matches = catalog.in_bbox(west, south, east, north)
+
+    ids = [str(zone["id"]) for zone in matches]
+    docs = await db.risk_zones.find({**query, "id": {"$in": ids}}, {"_id": 0}).to_list(length=None)
+    # Keep the index's order (nearest first for near)
+    by_id = {doc["id"]: doc for doc in docs}
+    return [by_id[i] for i in ids if i in by_id]
+
+# Declared before /{zone_id} so "stream" isn't taken for a zone id
+@router.get("/stream")
+async def stream_risk_zones(
+    last_event_id: Optional[str] = Header(None),
+    resume_from: Optional[str] = Query(None, alias="lastEventId", description="resume after this event id"),
+):
+    """
+    Server-Sent Events feed of risk zone changes: a "zones" event with the
+    changed zones after each refresh or write, "deleted" with the id of a
+    removed zone, and "reset" when a reconnecting client missed too much
+    and should reload GET /risk-zones.
+    """
+    try:
+        subscriber = zone_broadcaster.subscribe(last_event_id or resume_from)
+    except TooManySubscribers as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return StreamingResponse(
+        zone_broadcaster.stream(subscriber),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx from holding events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/{zone_id}", response_model=RiskZone)
 async def get_risk_zone(zone_id: str, db = Depends(get_database)):
@@ -46,6 +138,9 @@ async def create_risk_zone(
     
     zone_dict = zone.dict()
     await db.risk_zones.insert_one(zone_dict)
+    await upsert_catalog_zone(db, zone.id, zone_dict)
+    snapshot_store.invalidate("risk-zones")
+    publish_zone_changes([zone_dict])
     return zone_dict
 
 @router.put("/{zone_id}", response_model=RiskZone)
@@ -60,6 +155,9 @@ async def update_risk_zone(
     )
     if update_result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Risk zone not found or no changes made")
+    await upsert_catalog_zone(db, zone_id, zone.dict())
+    snapshot_store.invalidate("risk-zones")
+    publish_zone_changes([zone.dict()])
     return zone
 
 @router.delete("/{zone_id}")
@@ -71,4 +169,7 @@ async def delete_risk_zone(
     delete_result = await db.risk_zones.delete_one({"id": zone_id})
     if delete_result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Risk zone not found")
+    await delete_catalog_zone(db, zone_id)
+    snapshot_store.invalidate("risk-zones")
+    zone_broadcaster.publish("deleted", {"id": zone_id})
     return {"message": "Risk zone deleted successfully"}
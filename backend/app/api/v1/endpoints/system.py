@@ -0,0 +1,75 @@
+from fastapi import APIRouter
+from app.utils.http_client import get_pool_stats
+from app.utils.external_api import api_cache
+from app.utils.scheduler import refresh_scheduler
+from app.utils.inference_executor import inference_executor
+from app.utils.micro_batcher import prediction_batcher
+from app.utils.prediction import model_handler
+from app.utils.zone_catalog import zone_catalog
+from app.utils.snapshot_store import snapshot_store
+from app.utils.broadcaster import zone_broadcaster
+
+router = APIRouter()
+
+@router.get("/http-pool")
+async def get_http_pool_stats():
+    """
+    Outbound HTTP connection pool usage, to confirm keep-alive reuse under load.
+    """
+    return get_pool_stats()
+
+@router.get("/api-cache")
+async def get_api_cache_stats():
+    """
+    Hit/miss counters for the OpenWeather/USGS response cache.
+    """
+    return api_cache.stats()
+
+@router.get("/scheduler")
+async def get_scheduler_status():
+    """
+    Last-run duration, status and counters for each periodic refresh job.
+    """
+    return refresh_scheduler.status()
+
+@router.get("/inference")
+async def get_inference_stats():
+    """
+    Queue depth, rejections and latency percentiles of the inference executor.
+    """
+    return inference_executor.stats()
+
+@router.get("/micro-batcher")
+async def get_micro_batcher_stats():
+    """
+    Batch sizes and flush reasons for coalesced /predict requests.
+    """
+    return prediction_batcher.stats()
+
+@router.get("/prediction-cache")
+async def get_prediction_cache_stats():
+    """
+    Hit rate of the quantized-feature prediction cache for the active model.
+    """
+    return model_handler.prediction_cache.stats()
+
+@router.get("/zone-catalog")
+async def get_zone_catalog_status():
+    """
+    Size and last rebuild of the in-memory zone catalog index.
+    """
+    return zone_catalog.status()
+
+@router.get("/snapshots")
+async def get_snapshot_stats():
+    """
+    Hits, rebuilds and invalidations of the pre-encoded dashboard responses.
+    """
+    return snapshot_store.stats()
+
+@router.get("/zone-stream")
+async def get_zone_stream_stats():
+    """
+    Subscribers, deliveries and dropped slow consumers of /risk-zones/stream.
+    """
+    return zone_broadcaster.stats()
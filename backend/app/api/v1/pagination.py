@@ -0,0 +1,101 @@
+import base64
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from fastapi import HTTPException, Query, Response
+
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "100"))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "1000"))
+# Response header carrying the token for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class PageParams:
+    """
+    `limit`/`after` query parameters shared by the list endpoints.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, le=PAGE_MAX_LIMIT, description="max items per page"),
+        after: Optional[str] = Query(None, description=f"cursor from the previous page's {NEXT_CURSOR_HEADER} header"),
+    ):
+        self.limit = limit
+        self.after = after
+
+    @property
+    def is_default(self) -> bool:
+        # First page at the default size: what the dashboards request
+        return self.after is None and self.limit == PAGE_DEFAULT_LIMIT
+
+def _parse_sort(sort: str) -> Tuple[str, int]:
+    # "-confidence" sorts descending, "confidence" ascending
+    return (sort[1:], -1) if sort.startswith("-") else (sort, 1)
+
+def encode_cursor(sort: str, doc: Dict[str, Any]) -> str:
+    field, _ = _parse_sort(sort)
+    doc_id = doc["_id"]
+    payload = {
+        "s": sort,
+        "v": str(doc_id) if field == "_id" else doc.get(field),
+        "id": str(doc_id),
+        "oid": isinstance(doc_id, ObjectId),
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, sort: str) -> Tuple[Any, Any]:
+    """
+    (sort value, _id) of the last item of the previous page. Rejects tokens
+    that are malformed or were issued for a different sort order.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        doc_id = ObjectId(payload["id"]) if payload["oid"] else payload["id"]
+        value = payload["v"]
+        same_sort = payload["s"] == sort
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not same_sort:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different sort order")
+    field, _ = _parse_sort(sort)
+    return (doc_id if field == "_id" else value), doc_id
+
+def keyset_query(query: Dict[str, Any], sort: str, after: Optional[str], unique: bool = False) -> Dict[str, Any]:
+    """
+    `query` narrowed to the documents that come after the cursor in
+    (sort field, _id) order. _id breaks ties on non-unique fields, so pages
+    never overlap or skip.
+    """
+    if after is None:
+        return query
+    field, direction = _parse_sort(sort)
+    value, doc_id = decode_cursor(after, sort)
+    op = "$gt" if direction == 1 else "$lt"
+    if field == "_id":
+        position = {"_id": {op: doc_id}}
+    elif unique:
+        position = {field: {op: value}}
+    else:
+        position = {"$or": [{field: {op: value}}, {field: value, "_id": {op: doc_id}}]}
+    return {"$and": [query, position]} if query else position
+
+async def paginate(collection, query: Dict[str, Any], page: PageParams, response: Response,
+                   sort: str = "_id", unique: Iterable[str] = ()) -> List[Dict[str, Any]]:
+    """
+    One page of `collection` matching `query` in `sort` order. Reads at most
+    limit + 1 documents whatever the page number; when more remain, the next
+    page's cursor is set on the response's X-Next-Cursor header. Sort fields
+    listed in `unique` (backed by a unique index) need no _id tie-breaker.
+    """
+    field, direction = _parse_sort(sort)
+    unique = field == "_id" or field in unique
+    order = [(field, direction)] if unique else [(field, direction), ("_id", direction)]
+    cursor = collection.find(keyset_query(query, sort, page.after, unique)).sort(order).limit(page.limit + 1)
+    docs = await cursor.to_list(length=page.limit + 1)
+
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, docs[-1])
+    for doc in docs:
+        doc.pop("_id", None)
+    return docs
@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+# Indexes every collection should have, by collection name. Each entry is
+# (keys, options) as passed to create_index; names are fixed so re-running
+# against an existing database is a no-op.
+INDEX_SPEC: Dict[str, List[Tuple[List[Tuple[str, int]], Dict[str, Any]]]] = {
+    "users": [
+        ([("username", ASCENDING)], {"name": "username_unique", "unique": True}),
+    ],
+    "risk_zones": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+        # Keyset pagination: each sort field followed by the _id tie-breaker,
+        # with the riskLevel filter as the equality prefix where it applies
+        ([("riskLevel", ASCENDING), ("id", ASCENDING)], {"name": "riskLevel_id"}),
+        ([("riskLevel", ASCENDING), ("confidence", DESCENDING), ("_id", DESCENDING)],
+         {"name": "riskLevel_confidence__id"}),
+        ([("confidence", DESCENDING), ("_id", DESCENDING)], {"name": "confidence__id"}),
+        ([("zone", ASCENDING), ("_id", ASCENDING)], {"name": "zone__id"}),
+    ],
+    "zone_catalog": [
+        ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+    ],
+    "historical_events": [
+        # /history/events pages in _id order, filtered by zone, riskLevel or both
+        ([("zone", ASCENDING), ("_id", ASCENDING)], {"name": "zone__id"}),
+        ([("riskLevel", ASCENDING), ("_id", ASCENDING)], {"name": "riskLevel__id"}),
+        ([("zone", ASCENDING), ("riskLevel", ASCENDING), ("_id", ASCENDING)], {"name": "zone_riskLevel__id"}),
+    ],
+    "zone_activity": [
+        ([("incidents", DESCENDING), ("_id", DESCENDING)], {"name": "incidents__id"}),
+    ],
+    "insights": [
+        ([("confidence", DESCENDING), ("_id", DESCENDING)], {"name": "confidence__id"}),
+        # severity equality first, then the minConfidence range and confidence sort
+        ([("severity", ASCENDING), ("confidence", DESCENDING), ("_id", DESCENDING)],
+         {"name": "severity_confidence__id"}),
+        ([("severity", ASCENDING), ("_id", ASCENDING)], {"name": "severity__id"}),
+    ],
+}
+
+# The filtered or sorted queries the API runs, as (collection, filter, sort)
+# with sample values. Unsorted full-collection reads are left out: they scan
+# by design. find_one/update_one/delete_one on the same filter pick the same plan.
+QUERY_PLANS: List[Tuple[str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    ("users", {"username": "admin"}, None),
+    ("risk_zones", {"id": "1"}, None),
+    ("risk_zones", {"id": {"$in": ["1", "2"]}}, None),
+    ("zone_catalog", {"id": "1"}, None),
+    ("forecast_meta", {"_id": "current"}, None),
+    ("forecast_snapshots", {"_id": 1}, None),
+    ("forecast_snapshots", {"_id": {"$lte": 1}}, None),
+    # List endpoint pages (first page; later pages add a range on the same keys)
+    ("risk_zones", {}, [("id", ASCENDING)]),
+    ("risk_zones", {"riskLevel": "high"}, [("id", ASCENDING)]),
+    ("risk_zones", {"riskLevel": "high", "confidence": {"$gte": 80}},
+     [("confidence", DESCENDING), ("_id", DESCENDING)]),
+    ("risk_zones", {}, [("confidence", ASCENDING), ("_id", ASCENDING)]),
+    ("risk_zones", {}, [("zone", ASCENDING), ("_id", ASCENDING)]),
+    ("zone_activity", {}, [("incidents", DESCENDING), ("_id", DESCENDING)]),
+    ("insights", {}, [("confidence", DESCENDING), ("_id", DESCENDING)]),
+    ("historical_data", {}, [("_id", ASCENDING)]),
+    ("historical_events", {}, [("_id", ASCENDING)]),
+    ("historical_events", {"zone": "Pacific Northwest"}, [("_id", ASCENDING)]),
+    ("historical_events", {"riskLevel": "high"}, [("_id", ASCENDING)]),
+    ("historical_events", {"zone": "Pacific Northwest", "riskLevel": "high"}, [("_id", ASCENDING)]),
+    ("insights", {"severity": "high"}, [("_id", ASCENDING)]),
+    ("insights", {"confidence": {"$gte": 80}}, [("confidence", DESCENDING), ("_id", DESCENDING)]),
+    ("insights", {"severity": "high", "confidence": {"$gte": 80}},
+     [("confidence", DESCENDING), ("_id", DESCENDING)]),
+    ("insights", {"severity": "high", "confidence": {"$gte": 80}},
+     [("confidence", ASCENDING), ("_id", ASCENDING)]),
+    ("insights", {"severity": "high", "confidence": {"$gte": 80}}, [("_id", ASCENDING)]),
+]
+
+async def ensure_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create every index in INDEX_SPEC that is missing. Safe to run on every
+    start-up; an index that can't be built (e.g. duplicate values under a
+    unique index) is reported and skipped instead of stopping the app.
+    """
+    created = {}
+    for collection, indexes in INDEX_SPEC.items():
+        for keys, options in indexes:
+            try:
+                name = await db[collection].create_index(keys, **options)
+                created.setdefault(collection, []).append(name)
+            except OperationFailure as e:
+                print(f"Could not create index {options['name']} on {collection}: {e}")
+    return created
+
+def _plan_stages(plan: Dict[str, Any]):
+    yield plan.get("stage")
+    for child in ("inputStage", "queryPlan", "outerStage", "innerStage"):
+        if isinstance(plan.get(child), dict):
+            yield from _plan_stages(plan[child])
+    for stage in plan.get("inputStages", []):
+        yield from _plan_stages(stage)
+
+def winning_stages(explain: Dict[str, Any]) -> List[str]:
+    """
+    Stage names of an explain() result's winning plan, outermost first.
+    """
+    plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+    return [stage for stage in _plan_stages(plan) if stage]
+
+async def check_query_plans(db) -> List[Dict[str, Any]]:
+    """
+    explain() every query in QUERY_PLANS and return the ones whose winning
+    plan includes a COLLSCAN.
+    """
+    scans = []
+    for collection, query, sort in QUERY_PLANS:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = winning_stages(await cursor.explain())
+        if "COLLSCAN" in stages:
+            scans.append({"collection": collection, "filter": query, "sort": sort, "stages": stages})
+    return scans
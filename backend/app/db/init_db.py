@@ -1,6 +1,10 @@
+import asyncio
 from app.db.session import db_client, connect_to_mongo
+from app.db.indexes import ensure_indexes
 from app.models import RiskZone
-from app.utils.forecast_service import update_forecasts, update_risk_zones
+from app.utils.forecast_service import schedule_forecast_refresh, schedule_risk_zone_refresh
+from app.utils.zone_catalog import load_zone_catalog
+from app.utils.snapshot_store import snapshot_store
 from passlib.context import CryptContext
 import bcrypt
 
@@ -10,7 +14,14 @@ if not hasattr(bcrypt, "__about__"):
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-async def init_db():
+async def init_db(wait_for_refresh: bool = True):
+    """
+    Seed any empty collections. Collections that need live data get a
+    single-attempt refresh queued on the scheduler (the periodic jobs do the
+    retrying); with wait_for_refresh=False those runs are left in the
+    background and their tasks are returned.
+    """
+    refresh_tasks = []
     try:
         # Ensure connection is established
         if db_client.db is None:
@@ -20,6 +31,9 @@ async def init_db():
         
         # Ping the database to check if it's alive
         await db.command("ping")
+
+        # Indexes first, so the unique ones also guard the seed inserts below
+        await ensure_indexes(db)
         
         # Create default user if not exists
         user_count = await db.users.count_documents({})
@@ -28,11 +42,25 @@ async def init_db():
                 "username": "admin",
                 "email": "admin@pronezone.ai",
                 "full_name": "System Administrator",
-                "hashed_password": pwd_context.hash("admin123"),
-                "disabled": False
+                # bcrypt is slow on purpose; keep it off the event loop
+                "hashed_password": await asyncio.to_thread(pwd_context.hash, "admin123"),
+                "disabled": False,
+                "role": "admin"
             }
             await db.users.insert_one(admin_user)
         
+        # Seed the zone catalog (city used for weather lookups, population, coordinates)
+        if await db.zone_catalog.count_documents({}) == 0:
+            await db.zone_catalog.insert_many([
+                {"id": "1", "zone": "Pacific Northwest", "city": "Seattle", "population": "4.1M", "lat": 47.6062, "lng": -122.3321},
+                {"id": "2", "zone": "Southeast Asia Coastal", "city": "Bangkok", "population": "10.7M", "lat": 13.7563, "lng": 100.5018},
+                {"id": "3", "zone": "Central African Region", "city": "Kinshasa", "population": "17.0M", "lat": -4.4419, "lng": 15.2663},
+                {"id": "4", "zone": "Arctic Circle", "city": "Tromso", "population": "77k", "lat": 69.6492, "lng": 18.9553},
+                {"id": "5", "zone": "Caribbean Basin", "city": "Havana", "population": "2.1M", "lat": 23.1136, "lng": -82.3666},
+                {"id": "6", "zone": "Australian Outback", "city": "Alice Springs", "population": "25k", "lat": -23.6980, "lng": 133.8807},
+            ])
+        await load_zone_catalog()
+
         # Check if we already have risk zones
         count = await db.risk_zones.count_documents({})
         
@@ -102,12 +130,12 @@ async def init_db():
             
             await db.risk_zones.insert_many(initial_zones)
             print("Updating risk zones with real data...")
-            await update_risk_zones()
+            refresh_tasks.append(schedule_risk_zone_refresh(retries=0))
 
         # Seed Forecasts with REAL DATA
-        if await db.forecasts_24h.count_documents({}) == 0:
+        if await db.forecast_meta.find_one({"_id": "current"}) is None:
             print("Seeding forecasts with real data...")
-            await update_forecasts()
+            refresh_tasks.append(schedule_forecast_refresh(retries=0))
         
         # Seed Analytics
         if await db.risk_trends.count_documents({}) == 0:
@@ -249,8 +277,14 @@ async def init_db():
                     "confidence": 88,
                 }
             ])
+        # Anything served before seeding finished must not outlive it
+        snapshot_store.invalidate()
     except Exception as e:
         print(f"\nCRITICAL ERROR: Could not connect to MongoDB at {db_client.client.address}")
         print(f"Error details: {e}")
         print("Please ensure MongoDB is running: 'net start MongoDB' or start 'mongod.exe'\n")
         # In development, we allow the app to start but it will fail on DB calls
+
+    if wait_for_refresh and refresh_tasks:
+        await asyncio.gather(*refresh_tasks)
+    return refresh_tasks
@@ -26,5 +26,14 @@ async def connect_to_mongo():
     )
     db_client.db = db_client.client[DATABASE_NAME]
 
+async def ping_mongo() -> bool:
+    if db_client.db is None:
+        return False
+    try:
+        await db_client.db.command("ping")
+        return True
+    except Exception:
+        return False
+
 async def close_mongo_connection():
     db_client.client.close()
@@ -1,20 +1,76 @@
-from fastapi import FastAPI
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+import os
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api import api_router
-from app.db.session import connect_to_mongo, close_mongo_connection
+from app.db.session import connect_to_mongo, close_mongo_connection, ping_mongo
 from app.db.init_db import init_db
+from app.utils.http_client import open_http_client, close_http_client
+from app.utils.scheduler import refresh_scheduler, SCHEDULER_ENABLED
+from app.utils.warmup import warmup
+from app.utils.inference_executor import inference_executor
+from app.utils.conditional import ConditionalGetMiddleware
+
+warmup.record("import", time.perf_counter() - _import_started)
+
+# "fast": accept traffic once Mongo is connected and warm up in the background.
+# "blocking": finish seeding and the initial refresh before serving.
+STARTUP_MODE = os.getenv("STARTUP_MODE", "blocking").lower()
+# Whether /health/ready should wait for warm-up to finish
+READY_REQUIRES_WARMUP = os.getenv("READY_REQUIRES_WARMUP", "false").lower() == "true"
 
 app = FastAPI(title="ProneZone Predictor API", version="1.0.0")
 
+async def initial_refresh(refresh_tasks):
+    """
+    Wait for the refreshes init_db queued; raises if any of them failed.
+    """
+    results = await asyncio.gather(*refresh_tasks)
+    if not all(results):
+        raise RuntimeError(f"{results.count(False)} of {len(results)} initial refreshes failed")
+
+async def warm_up():
+    try:
+        # Load the model off the event loop (and in every worker process) before the first prediction needs it
+        await warmup.step("load_model", inference_executor.warm_up)
+        refresh_tasks = await warmup.step("seed_database", lambda: init_db(wait_for_refresh=False))
+        await warmup.step("initial_refresh", lambda: initial_refresh(refresh_tasks))
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+    timings = ", ".join(f"{name}={seconds:.3f}s" for name, seconds in warmup.timings.items())
+    print(f"Startup timings: {timings}")
+
 # Database connection events
 @app.on_event("startup")
 async def startup_event():
+    start = time.perf_counter()
     await connect_to_mongo()
-    await init_db()
+    await ping_mongo()
+    warmup.record("db_connect", time.perf_counter() - start)
+    await open_http_client()
+    warmup.expect("load_model", "seed_database", "initial_refresh")
+    if STARTUP_MODE == "fast":
+        app.state.warmup_task = asyncio.create_task(warm_up())
+    else:
+        await warm_up()
+    if SCHEDULER_ENABLED:
+        refresh_scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await refresh_scheduler.stop()
     await close_mongo_connection()
+    await close_http_client()
+    inference_executor.shutdown()
+
+# ETag/Cache-Control for read endpoints; added first so CORS headers also reach 304s
+app.add_middleware(ConditionalGetMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -23,12 +79,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the next-page cursor of list endpoints
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/")
 async def root():
     return {"message": "ProneZone Predictor API is operational", "version": "1.0.0"}
 
+@app.get("/health/live")
+async def liveness():
+    return {"status": "alive", "warmup": warmup.status()}
+
+@app.get("/health/ready")
+async def readiness(response: Response):
+    database = await ping_mongo()
+    ready = database and (warmup.complete or not READY_REQUIRES_WARMUP)
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "not ready",
+        "database": database,
+        "modelLoaded": inference_executor.model_loaded,
+        "warmup": warmup.status(),
+    }
+
 app.include_router(api_router, prefix="/api/v1")
 
 if __name__ == "__main__":
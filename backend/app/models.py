@@ -1,5 +1,11 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+class SeismicFeatures(BaseModel):
+    eventCount: int = 0
+    maxMagnitude: Optional[float] = None
+    nearestKm: Optional[float] = None
+    latestEventAt: Optional[str] = None
 
 class RiskZone(BaseModel):
     id: str
@@ -12,6 +18,7 @@ class RiskZone(BaseModel):
     lastUpdate: Optional[str] = "Just now"
     lat: Optional[float] = 0.0
     lng: Optional[float] = 0.0
+    seismic: Optional[SeismicFeatures] = None
 
 class SystemStatus(BaseModel):
     modelAccuracy: str
@@ -126,11 +133,18 @@ class ComparisonTrend(BaseModel):
     caribbean: int
     arctic: int
 
+class ModelVersion(BaseModel):
+    version: str
+    active: bool
+    createdAt: Optional[str] = None
+    checksums: Dict[str, str] = {}
+
 class User(BaseModel):
     username: str
     email: Optional[str] = None
     full_name: Optional[str] = None
     disabled: Optional[bool] = None
+    role: Optional[str] = None
 
 class UserInDB(User):
     hashed_password: str
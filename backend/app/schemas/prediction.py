@@ -1,6 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
 
 class PredictionInput(BaseModel):
+    # NaN/inf would be routed differently by the compiled engine and sklearn
+    model_config = ConfigDict(allow_inf_nan=False)
+
     temperature_celsius: float
     feels_like_celsius: float
     humidity: float
@@ -10,5 +14,18 @@ class PredictionInput(BaseModel):
     risk_cluster: int
 
 class PredictionOutput(BaseModel):
+    # Allow the "model_" prefix on model_version
+    model_config = ConfigDict(protected_namespaces=())
+
     risk_level: str
     confidence: float
+    model_version: Optional[str] = None
+
+class BatchPredictionInput(BaseModel):
+    items: List[PredictionInput]
+
+class BatchPredictionOutput(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    predictions: List[PredictionOutput]
+    model_version: Optional[str] = None
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set, Tuple
+
+# Events queued per client before it counts as a slow consumer and is dropped
+SSE_CLIENT_BUFFER = int(os.getenv("SSE_CLIENT_BUFFER", "32"))
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "10000"))
+# Comment line sent when idle, so proxies keep the connection open
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+# Recent events kept for clients reconnecting with Last-Event-ID
+SSE_REPLAY_EVENTS = int(os.getenv("SSE_REPLAY_EVENTS", "64"))
+
+_HEARTBEAT = b": ping\n\n"
+
+class TooManySubscribers(Exception):
+    pass
+
+def encode_event(event_id: int, event: str, data: bytes) -> bytes:
+    # data is compact JSON, so it never contains the newlines SSE would split on
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event.encode(), data)
+
+class Subscriber:
+    def __init__(self, buffer: int):
+        self.queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=buffer)
+        self.dropped = False
+
+    def offer(self, message: bytes) -> bool:
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self):
+        # Discard what it hasn't read and wake it up to end the stream
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class Broadcaster:
+    """
+    Fans server-sent events out to every subscriber. Each event is encoded
+    once and the same bytes are queued for everyone; a subscriber whose
+    bounded queue is full is dropped instead of slowing down the rest.
+    """
+
+    def __init__(self, buffer: int = SSE_CLIENT_BUFFER, max_subscribers: int = SSE_MAX_SUBSCRIBERS,
+                 replay: int = SSE_REPLAY_EVENTS):
+        self.buffer = buffer
+        self.max_subscribers = max_subscribers
+        self.subscribers: Set[Subscriber] = set()
+        self.history: Deque[Tuple[int, bytes]] = deque(maxlen=replay)
+        self.last_id = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """
+        Register a subscriber. With `last_event_id`, events it missed are
+        queued first, or a "reset" event if they are no longer kept.
+        """
+        if len(self.subscribers) >= self.max_subscribers:
+            raise TooManySubscribers(f"{len(self.subscribers)} subscribers already connected")
+        subscriber = Subscriber(self.buffer)
+        if last_event_id is not None:
+            try:
+                seen = int(last_event_id)
+            except ValueError:
+                seen = -1
+            if seen != self.last_id:
+                missed = [message for event_id, message in self.history if event_id > seen]
+                kept_from = self.history[0][0] if self.history else self.last_id + 1
+                # Ids from before a restart, or a gap we no longer have: start over
+                if seen > self.last_id or seen < kept_from - 1 or len(missed) > self.buffer:
+                    missed = [encode_event(self.last_id, "reset", b"{}")]
+                for message in missed:
+                    subscriber.offer(message)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, event: str, payload: Any, encoded: Optional[bytes] = None) -> int:
+        """
+        Queue one event for every subscriber; returns how many got it.
+        Pass `encoded` to skip JSON-encoding `payload` here.
+        """
+        if encoded is None:
+            encoded = json.dumps(payload, separators=(",", ":")).encode()
+        self.last_id += 1
+        message = encode_event(self.last_id, event, encoded)
+        self.history.append((self.last_id, message))
+        self.published += 1
+
+        delivered = 0
+        for subscriber in list(self.subscribers):
+            if subscriber.offer(message):
+                delivered += 1
+            else:
+                subscriber.dropped = True
+                subscriber.close()
+                self.subscribers.discard(subscriber)
+                self.dropped += 1
+        self.delivered += delivered
+        return delivered
+
+    async def stream(self, subscriber: Subscriber, heartbeat: float = SSE_HEARTBEAT_SECONDS) -> AsyncIterator[bytes]:
+        """
+        The subscriber's events as an SSE byte stream, with heartbeats while
+        idle. Ends when the subscriber is dropped; unsubscribes on exit.
+        """
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield _HEARTBEAT
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "maxSubscribers": self.max_subscribers,
+            "clientBuffer": self.buffer,
+            "lastEventId": self.last_id,
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+# Risk zone changes, published after each refresh and CRUD write
+zone_broadcaster = Broadcaster()
@@ -0,0 +1,189 @@
+import csv
+import io
+import json
+import math
+import os
+from typing import AsyncIterator, Iterator, List, Optional
+import numpy as np
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from app.utils.prediction import FEATURES
+from app.utils.inference_executor import inference_executor
+
+# Rows parsed and scored per step; with the read-ahead of one request
+# chunk this bounds memory use no matter how large the upload is
+STREAM_BLOCK_ROWS = int(os.getenv("STREAM_BLOCK_ROWS", "2048"))
+
+BULK_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+class BulkFormatError(ValueError):
+    pass
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body is produced while the request body is still
+    being read. Starlette's version listens for a disconnect on the same
+    receive channel and would swallow the upload; here reading the request
+    stream raises ClientDisconnect instead when the client goes away.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+def _feature_value(record: dict, name: str) -> float:
+    value = record[name]
+    # json.loads accepts NaN/Infinity, and bools are ints to Python
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{name!r} must be a finite number, got {json.dumps(value)}")
+    return value
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Pick "ndjson" or "csv" from an explicit ?format= or the Content-Type.
+    """
+    if requested:
+        if requested.lower() not in BULK_FORMATS:
+            raise BulkFormatError(f"Unsupported format: {requested}")
+        return requested.lower()
+    if content_type and "csv" in content_type.lower():
+        return "csv"
+    return "ndjson"
+
+class BlockParser:
+    """
+    Incremental parser for newline-delimited uploads. feed() takes raw
+    request chunks and yields (N, len(FEATURES)) float matrices of at most
+    `block_rows` rows; close() yields whatever is left at the end.
+    """
+
+    def __init__(self, fmt: str, block_rows: int = STREAM_BLOCK_ROWS):
+        self.fmt = fmt
+        self.block_rows = max(block_rows, 1)
+        self.remainder = b""
+        self.lines: List[bytes] = []
+        self.columns: Optional[List[int]] = None
+        self.rows_parsed = 0
+
+    def feed(self, chunk: bytes) -> Iterator[np.ndarray]:
+        lines = (self.remainder + chunk).split(b"\n")
+        self.remainder = lines.pop()
+        for line in lines:
+            yield from self._add_line(line)
+
+    def close(self) -> Iterator[np.ndarray]:
+        yield from self._add_line(self.remainder)
+        self.remainder = b""
+        if self.lines:
+            yield from self._parse_block()
+
+    def _add_line(self, line: bytes) -> Iterator[np.ndarray]:
+        line = line.strip()
+        if not line:
+            return
+        if self.fmt == "csv" and self.columns is None:
+            self._read_header(line)
+            return
+        self.lines.append(line)
+        if len(self.lines) >= self.block_rows:
+            yield from self._parse_block()
+
+    def _read_header(self, line: bytes):
+        header = [name.strip() for name in next(csv.reader([line.decode("utf-8-sig")]))]
+        missing = [f for f in FEATURES if f not in header]
+        if missing:
+            raise BulkFormatError(f"CSV header is missing columns: {', '.join(missing)}")
+        self.columns = [header.index(f) for f in FEATURES]
+
+    def _parse_block(self) -> Iterator[np.ndarray]:
+        lines, self.lines = self.lines, []
+        first_row = self.rows_parsed
+        self.rows_parsed += len(lines)
+        if self.fmt == "csv":
+            try:
+                matrix = np.loadtxt(io.StringIO(b"\n".join(lines).decode()), delimiter=",",
+                                    usecols=self.columns, ndmin=2, quotechar='"', dtype=np.float64)
+            except ValueError as e:
+                raise BulkFormatError(f"Malformed input between rows {first_row} and {self.rows_parsed - 1}: {e}")
+            finite = np.isfinite(matrix).all(axis=1)
+            if finite.all():
+                yield matrix
+                return
+            # loadtxt reads "nan" and "inf" as numbers
+            bad, error = int(np.argmin(finite)), "values must be finite numbers"
+        else:
+            # One json.loads per line, so a line holding two objects can't shift the row numbers
+            matrix = np.empty((len(lines), len(FEATURES)), dtype=np.float64)
+            for i, line in enumerate(lines):
+                try:
+                    record = json.loads(line)
+                    matrix[i] = [_feature_value(record, f) for f in FEATURES]
+                except (ValueError, KeyError, TypeError, OverflowError) as e:
+                    bad, error = i, e
+                    break
+            else:
+                yield matrix
+                return
+        # The rows before the bad line are still scored; the stream stops at it
+        if bad:
+            yield matrix[:bad]
+        raise BulkFormatError(f"Malformed input on row {first_row + bad}: {error}")
+
+def format_block(fmt: str, first_row: int, labels: np.ndarray, confidences: np.ndarray, version: str) -> bytes:
+    version_json = json.dumps(version)
+    label_json = {label: json.dumps(str(label)) for label in set(labels.tolist())}
+    rows = range(first_row, first_row + len(labels))
+    if fmt == "csv":
+        return "".join(
+            f"{row},{label},{conf!r},{version}\n"
+            for row, label, conf in zip(rows, labels.tolist(), confidences.tolist())
+        ).encode()
+    return "".join(
+        f'{{"row":{row},"risk_level":{label_json[label]},"confidence":{conf!r},"model_version":{version_json}}}\n'
+        for row, label, conf in zip(rows, labels.tolist(), confidences.tolist())
+    ).encode()
+
+async def score_stream(chunks: AsyncIterator[bytes], fmt: str,
+                       block_rows: int = STREAM_BLOCK_ROWS) -> AsyncIterator[bytes]:
+    """
+    Score an upload block by block and yield the encoded results as each
+    block finishes. The next chunk is only read once the previous block
+    has been scored and handed on. A malformed CSV block or NDJSON line, or
+    a scoring failure, ends the stream with an error record, since the 200
+    status has already been sent by then.
+    """
+    parser = BlockParser(fmt, block_rows)
+    next_row = 0
+    if fmt == "csv":
+        yield b"row,risk_level,confidence,model_version\n"
+
+    async def score(matrix: np.ndarray) -> bytes:
+        nonlocal next_row
+        # Bulk rows are rarely repeated, so keep them out of the prediction cache,
+        # and wait for a worker rather than failing a half-written response
+        labels, confidences, version = await inference_executor.predict_many(
+            matrix, bounded=False, use_cache=False
+        )
+        encoded = format_block(fmt, next_row, labels, confidences, version)
+        next_row += len(matrix)
+        return encoded
+
+    def error_line(message: str) -> bytes:
+        if fmt == "csv":
+            return f"# error: {message}\n".encode()
+        return (json.dumps({"error": message, "row": next_row}) + "\n").encode()
+
+    try:
+        async for chunk in chunks:
+            for matrix in parser.feed(chunk):
+                yield await score(matrix)
+        for matrix in parser.close():
+            yield await score(matrix)
+    except BulkFormatError as e:
+        yield error_line(str(e))
+    except ClientDisconnect:
+        raise
+    except Exception as e:
+        # Ends the stream readably instead of cutting the chunked response off
+        yield error_line(f"Scoring failed on row {next_row}: {e}")
@@ -0,0 +1,113 @@
+import numpy as np
+from typing import Optional
+
+# Rows scored per traversal block; bounds the (rows x trees x classes) leaf array
+COMPILED_BLOCK_ROWS = 4096
+
+SUPPORTED_MODELS = {
+    "DecisionTreeClassifier",
+    "ExtraTreeClassifier",
+    "RandomForestClassifier",
+    "ExtraTreesClassifier",
+}
+
+class CompiledModel:
+    """
+    Pure-NumPy copy of a fitted StandardScaler + tree classifier (a single
+    decision tree or a RandomForest/ExtraTrees ensemble). All trees are
+    flattened into shared node arrays and a whole batch walks them together,
+    one level per step, without sklearn's per-call validation.
+    """
+
+    def __init__(self, scaler, model, n_features: int):
+        self.n_features = n_features
+        self.classes_ = model.classes_
+        n_classes = len(self.classes_)
+
+        n_inputs = scaler.n_features_in_
+        with_mean = scaler.with_mean and scaler.mean_ is not None
+        with_std = scaler.with_std and scaler.scale_ is not None
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64) if with_mean else np.zeros(n_inputs)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64) if with_std else np.ones(n_inputs)
+
+        trees = [est.tree_ for est in getattr(model, "estimators_", [model])]
+        offsets = np.cumsum([0] + [t.node_count for t in trees[:-1]])
+        self.roots = offsets.astype(np.intp)
+        self.n_trees = len(trees)
+
+        features, thresholds, lefts, rights, leaf_proba = [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left < 0
+            # Leaves point back at themselves so extra traversal steps are no-ops
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+
+            # Same normalisation sklearn applies to each tree's leaf values
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            leaf_proba.append(proba / normalizer)
+
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds).astype(np.float64)
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.column_stack([np.concatenate(lefts), np.concatenate(rights)]).astype(np.intp).ravel()
+        self.is_leaf = np.concatenate([t.children_left < 0 for t in trees])
+        self.leaf_proba = np.concatenate(leaf_proba)
+
+    def transform(self, matrix: np.ndarray) -> np.ndarray:
+        scaled = (matrix - self.mean) / self.scale
+        # sklearn trees evaluate splits on float32 inputs
+        return scaled[:, :self.n_features].astype(np.float32)
+
+    def _predict_proba_block(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_cols = X.shape
+        flat_X = X.ravel()
+        # One lane per (tree, row) pair, tree-major
+        nodes = np.repeat(self.roots, n_rows)
+        row_offsets = np.tile(np.arange(n_rows) * n_cols, self.n_trees)
+
+        # Advance every lane one level per step; lanes drop out at their leaf
+        active = np.flatnonzero(~self.is_leaf[nodes])
+        while active.size:
+            current = nodes[active]
+            values = flat_X[row_offsets[active] + self.feature[current]]
+            go_right = values > self.threshold[current]
+            nodes[active] = self.children[2 * current + go_right]
+            active = active[~self.is_leaf[nodes[active]]]
+
+        # Average over trees (equal to sklearn up to float rounding)
+        leaf_proba = self.leaf_proba[nodes].reshape(self.n_trees, n_rows, -1)
+        return leaf_proba.sum(axis=0) / self.n_trees
+
+    def predict_proba(self, matrix: np.ndarray) -> np.ndarray:
+        X = self.transform(np.atleast_2d(np.asarray(matrix, dtype=np.float64)))
+        if X.shape[0] <= COMPILED_BLOCK_ROWS:
+            return self._predict_proba_block(X)
+        return np.concatenate([
+            self._predict_proba_block(X[i:i + COMPILED_BLOCK_ROWS])
+            for i in range(0, X.shape[0], COMPILED_BLOCK_ROWS)
+        ])
+
+def compile_model(scaler, model, n_features: int) -> Optional[CompiledModel]:
+    """
+    Build a CompiledModel, or return None for estimators it can't reproduce.
+    """
+    if type(model).__name__ not in SUPPORTED_MODELS or type(scaler).__name__ != "StandardScaler":
+        return None
+    if getattr(model, "n_outputs_", 1) != 1:
+        return None
+    return CompiledModel(scaler, model, n_features)
+
+def probe_rows(scaler, n: int = 256, seed: int = 0) -> np.ndarray:
+    """
+    Deterministic rows spread around the scaler's training distribution,
+    used to check a compiled model against sklearn.
+    """
+    rng = np.random.default_rng(seed)
+    mean = np.asarray(scaler.mean_, dtype=np.float64)
+    scale = np.asarray(scaler.scale_, dtype=np.float64)
+    return mean + rng.normal(0, 1.5, (n, len(mean))) * scale
@@ -0,0 +1,99 @@
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional
+from fastapi import Request, Response
+
+# Sent with every read response. "no-cache" lets clients keep a copy but
+# revalidate it each time, which If-None-Match turns into a cheap 304; set
+# e.g. "public, max-age=5" to let pollers skip some requests entirely.
+READ_CACHE_CONTROL = os.getenv("READ_CACHE_CONTROL", "no-cache")
+
+# GET routes whose JSON responses get an ETag and Cache-Control from
+# ConditionalGetMiddleware (snapshot-served routes already carry their own)
+CONDITIONAL_GET_PATHS = tuple(
+    path.strip() for path in os.getenv(
+        "CONDITIONAL_GET_PATHS",
+        "/api/v1/risk-zones,/api/v1/forecast,/api/v1/analytics,/api/v1/explain,/api/v1/history,/api/v1/reports",
+    ).split(",") if path.strip()
+)
+
+def make_etag(body: bytes, suffix: str = "") -> str:
+    """
+    Strong ETag for a response body; `suffix` tells encodings of it apart.
+    """
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}{suffix}"'
+
+def _opaque(tag: str) -> str:
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: Optional[str], etags: Iterable[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    sent = {_opaque(tag) for tag in if_none_match.split(",")}
+    return any(_opaque(tag) in sent for tag in etags)
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    # A 304 repeats the validators and caching headers, never the body or its encoding
+    kept = {k: v for k, v in headers.items() if k.lower() not in ("content-encoding", "content-length", "content-type")}
+    return Response(status_code=304, headers=kept)
+
+class ConditionalGetMiddleware:
+    """
+    Adds a strong ETag and Cache-Control to JSON GET responses under
+    CONDITIONAL_GET_PATHS and answers a matching If-None-Match with 304.
+    The endpoint still runs; this saves bandwidth, not the query. Responses
+    that already have an ETag (snapshots) or aren't JSON pass through as-is.
+    """
+
+    def __init__(self, app, paths: Iterable[str] = CONDITIONAL_GET_PATHS):
+        self.app = app
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "GET"
+                or not scope["path"].startswith(self.paths)):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        start = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def buffered_send(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                names = {k.lower(): v for k, v in message.get("headers", [])}
+                passthrough = (
+                    message["status"] != 200
+                    or b"etag" in names
+                    or not names.get(b"content-type", b"").startswith(b"application/json")
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            etag = make_etag(body)
+            headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"cache-control"]
+            headers += [(b"etag", etag.encode("latin-1")), (b"cache-control", READ_CACHE_CONTROL.encode("latin-1"))]
+            if etag_matches(request.headers.get("if-none-match"), [etag]):
+                response = not_modified({k.decode("latin-1"): v.decode("latin-1") for k, v in headers})
+                await response(scope, receive, send)
+                return
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, buffered_send)
@@ -1,13 +1,48 @@
 import os
+import asyncio
 import httpx
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Awaitable, Callable, Iterable, Optional
 from dotenv import load_dotenv
+from app.utils.http_client import get_http_client
+from app.utils.cache import TTLCache
+from app.utils.zone_catalog import ensure_zone_catalog
 
 load_dotenv()
 
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 USGS_API_BASE_URL = os.getenv("USGS_API_BASE_URL", "https://earthquake.usgs.gov/fdsnws/event/1/query")
 
+# Fan-out limits for refreshes that fetch many cities at once
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+FETCH_TIMEOUT_SECONDS = float(os.getenv("FETCH_TIMEOUT_SECONDS", "10"))
+
+# Upstream response cache: OpenWeather refreshes current conditions roughly
+# every 10 minutes and forecasts every 3 hours. A TTL of 0 disables caching.
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+FORECAST_CACHE_TTL = float(os.getenv("FORECAST_CACHE_TTL", "10800"))
+SEISMIC_CACHE_TTL = float(os.getenv("SEISMIC_CACHE_TTL", "300"))
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "1024"))
+
+api_cache = TTLCache(maxsize=API_CACHE_MAX_ENTRIES)
+
+def _normalize_city(city: str) -> str:
+    return " ".join(city.split()).lower()
+
+def _is_cacheable(payload: Dict[str, Any]) -> bool:
+    # Never cache upstream failures
+    return "error" not in payload
+
+async def _get_json(url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    client = get_http_client()
+    try:
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        return {"error": f"HTTP error occurred: {e.response.status_code}"}
+    except Exception as e:
+        return {"error": f"An error occurred: {str(e)}"}
+
 async def fetch_weather_data(city: str) -> Dict[str, Any]:
     """
     Fetch current weather data for a city using OpenWeatherMap API.
@@ -15,16 +50,14 @@ async def fetch_weather_data(city: str) -> Dict[str, Any]:
     if not OPENWEATHER_API_KEY or OPENWEATHER_API_KEY == "your_openweathermap_api_key":
         return {"error": "OpenWeatherMap API key not configured"}
     
-    url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": f"HTTP error occurred: {e.response.status_code}"}
-        except Exception as e:
-            return {"error": f"An error occurred: {str(e)}"}
+    url = "https://api.openweathermap.org/data/2.5/weather"
+    params = {"q": city, "appid": OPENWEATHER_API_KEY, "units": "metric"}
+    return await api_cache.get_or_fetch(
+        ("weather", _normalize_city(city)),
+        WEATHER_CACHE_TTL,
+        lambda: _get_json(url, params),
+        cacheable=_is_cacheable,
+    )
 
 async def fetch_forecast_data(city: str) -> Dict[str, Any]:
     """
@@ -33,16 +66,14 @@ async def fetch_forecast_data(city: str) -> Dict[str, Any]:
     if not OPENWEATHER_API_KEY or OPENWEATHER_API_KEY == "your_openweathermap_api_key":
         return {"error": "OpenWeatherMap API key not configured"}
     
-    url = f"https://api.openweathermap.org/data/2.5/forecast?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": f"HTTP error occurred: {e.response.status_code}"}
-        except Exception as e:
-            return {"error": f"An error occurred: {str(e)}"}
+    url = "https://api.openweathermap.org/data/2.5/forecast"
+    params = {"q": city, "appid": OPENWEATHER_API_KEY, "units": "metric"}
+    return await api_cache.get_or_fetch(
+        ("forecast", _normalize_city(city)),
+        FORECAST_CACHE_TTL,
+        lambda: _get_json(url, params),
+        cacheable=_is_cacheable,
+    )
 
 async def fetch_seismic_data(starttime: str, endtime: str, minmagnitude: float = 2.5) -> Dict[str, Any]:
     """
@@ -54,41 +85,69 @@ async def fetch_seismic_data(starttime: str, endtime: str, minmagnitude: float =
         "endtime": endtime,
         "minmagnitude": minmagnitude
     }
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(USGS_API_BASE_URL, params=params)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            return {"error": f"HTTP error occurred: {e.response.status_code}"}
-        except Exception as e:
-            return {"error": f"An error occurred: {str(e)}"}
-
-async def get_real_time_indicators(zone_name: str) -> List[str]:
+    return await api_cache.get_or_fetch(
+        ("seismic", starttime, endtime, float(minmagnitude)),
+        SEISMIC_CACHE_TTL,
+        lambda: _get_json(USGS_API_BASE_URL, params),
+        cacheable=_is_cacheable,
+    )
+
+async def fetch_many(
+    fetch: Callable[[str], Awaitable[Dict[str, Any]]],
+    keys: Iterable[str],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run `fetch` for every key concurrently, at most `concurrency` at a time.
+    Each call is bounded by `timeout` seconds; failures come back as {"error": ...}
+    payloads, like the individual fetch functions return them.
+    """
+    keys = list(dict.fromkeys(keys))
+    semaphore = asyncio.Semaphore(concurrency or FETCH_CONCURRENCY)
+    timeout = timeout or FETCH_TIMEOUT_SECONDS
+
+    async def run(key: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(fetch(key), timeout)
+            except asyncio.TimeoutError:
+                return {"error": f"Request timed out after {timeout}s"}
+            except Exception as e:
+                return {"error": f"An error occurred: {str(e)}"}
+
+    results = await asyncio.gather(*(run(key) for key in keys))
+    return dict(zip(keys, results))
+
+async def get_real_time_indicators(
+    zone_name: str,
+    weather: Optional[Dict[str, Any]] = None,
+    seismic: Optional[Dict[str, Any]] = None,
+) -> List[str]:
     """
     Example function to get real-time indicators based on external data.
     In a real scenario, this would analyze the fetched data to determine indicators.
+    Pass `weather` to reuse an already-fetched payload instead of fetching it again,
+    and `seismic` with the zone's features from seismic.ingest_seismic.
     """
+    # Deferred import: the seismic stage builds on the fetchers in this module
+    from app.utils.seismic import seismic_indicators
+
     # This is a simplified implementation
     indicators = []
     
-    # Map zone name to city/region for weather/seismic data
-    zone_mapping = {
-        "Pacific Northwest": {"city": "Seattle", "coords": [47.6, -122.3]},
-        "Southeast Asia Coastal": {"city": "Bangkok", "coords": [13.7, 100.5]},
-        "Caribbean Basin": {"city": "Havana", "coords": [23.1, -82.3]},
-    }
-    
-    mapping = zone_mapping.get(zone_name)
+    # Look up the zone's city/coordinates in the catalog for weather/seismic data
+    mapping = (await ensure_zone_catalog()).get_by_name(zone_name)
     if mapping:
         # Fetch weather (example: check for high wind or rain)
-        weather = await fetch_weather_data(mapping["city"])
+        if weather is None:
+            weather = await fetch_weather_data(mapping["city"])
         if "wind" in weather and weather["wind"].get("speed", 0) > 10:
             indicators.append("High Wind Speed")
         if "weather" in weather and any(w["main"] == "Rain" for w in weather["weather"]):
             indicators.append("Heavy Rainfall")
-            
-        # Fetch seismic (example: check for recent earthquakes nearby)
-        # Note: In a real app, we'd use coordinates to filter USGS data
+
+        # Nearby earthquakes, already matched to this zone by coordinates
+        indicators.extend(seismic_indicators(seismic))
     
     return indicators if indicators else ["Normal Conditions"]
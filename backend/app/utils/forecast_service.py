@@ -1,33 +1,71 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from app.utils.external_api import fetch_forecast_data, fetch_weather_data, get_real_time_indicators
-from app.utils.prediction import model_handler
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+from app.models import RiskZone
+from app.utils.external_api import fetch_forecast_data, fetch_weather_data, fetch_many, get_real_time_indicators
+from app.utils.inference_executor import inference_executor
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.db.session import db_client
+from app.utils.scheduler import refresh_scheduler
+from app.utils.zone_catalog import ensure_zone_catalog
+from app.utils.seismic import ingest_seismic
+from app.utils.snapshot_store import snapshot_store
+from app.utils.broadcaster import zone_broadcaster
 
-ZONE_CITY_MAPPING = {
-    "Pacific Northwest": {"city": "Seattle", "pop": "4.1M", "lat": 47.6062, "lng": -122.3321},
-    "Southeast Asia Coastal": {"city": "Bangkok", "pop": "10.7M", "lat": 13.7563, "lng": 100.5018},
-    "Caribbean Basin": {"city": "Havana", "pop": "2.1M", "lat": 23.1136, "lng": -82.3666},
-    "Central African Region": {"city": "Kinshasa", "pop": "17.0M", "lat": -4.4419, "lng": 15.2663},
-    "Arctic Circle": {"city": "Tromso", "pop": "77k", "lat": 69.6492, "lng": 18.9553},
-    "Australian Outback": {"city": "Alice Springs", "pop": "25k", "lat": -23.6980, "lng": 133.8807}
-}
+# Forecast snapshots older than this are served but trigger a background refresh
+FORECAST_MAX_AGE_SECONDS = int(os.getenv("FORECAST_MAX_AGE_SECONDS", "10800"))
+# After a failed refresh, stale reads wait this long before triggering another one
+FORECAST_RETRY_COOLDOWN_SECONDS = int(os.getenv("FORECAST_RETRY_COOLDOWN_SECONDS", "300"))
+
+# Number of forecast snapshot versions kept around after a refresh
+FORECAST_SNAPSHOT_RETENTION = int(os.getenv("FORECAST_SNAPSHOT_RETENTION", "5"))
+
+# Snapshot field names per forecast horizon
+FORECAST_SNAPSHOT_FIELDS = {"24h": "forecast24h", "3day": "forecast3day", "7day": "forecast7day"}
+
+# Encodes pushed zone updates the same way GET /risk-zones does
+_risk_zone_list = TypeAdapter(List[RiskZone])
+
+# Periodic refresh intervals for the in-process scheduler (0 disables a job's timer)
+RISK_ZONE_REFRESH_INTERVAL = float(os.getenv("RISK_ZONE_REFRESH_INTERVAL", "600"))
+FORECAST_REFRESH_INTERVAL = float(os.getenv("FORECAST_REFRESH_INTERVAL", "3600"))
+
+# Raised by a refresh job that published nothing, so the scheduler retries it
+class RefreshFailed(Exception):
+    pass
 
 async def update_risk_zones():
     db = db_client.db
-    if not db:
-        return
+    if db is None:
+        raise RefreshFailed("Database not connected")
 
+    catalog = await ensure_zone_catalog()
     cursor = db.risk_zones.find({})
-    zones = await cursor.to_list(length=100)
+    zones = await cursor.to_list(length=None)
+
+    # Fetch every city concurrently up front, alongside one global seismic feed
+    # Zones added through the API have no city (and so no weather) until one is set in the catalog
+    cities = [catalog.get(z["id"])["city"] for z in zones if (catalog.get(z["id"]) or {}).get("city")]
+    weather_by_city, seismic_by_zone = await asyncio.gather(
+        fetch_many(fetch_weather_data, cities), ingest_seismic(catalog)
+    )
+    if cities and not any("main" in weather for weather in weather_by_city.values()):
+        first_error = next(iter(weather_by_city.values())).get("error", "Unknown error")
+        raise RefreshFailed(f"No weather data fetched for {len(weather_by_city)} cities: {first_error}")
+    changed = []
+    updated = 0
     
     for zone in zones:
-        mapping = ZONE_CITY_MAPPING.get(zone["zone"])
-        if not mapping:
+        mapping = catalog.get(zone["id"])
+        if not mapping or not mapping.get("city"):
             continue
             
         city = mapping["city"]
-        weather = await fetch_weather_data(city)
+        weather = weather_by_city[city]
         if "main" not in weather:
             continue
 
@@ -48,39 +86,74 @@ async def update_risk_zones():
         }
         
         try:
-            prediction, confidence = model_handler.predict(input_data)
+            # Refresh jobs wait for a worker rather than being shed like API calls
+            prediction, confidence, _ = await inference_executor.predict(input_data, bounded=False)
             
             risk_levels = ["safe", "moderate", "high", "critical"]
             risk_level = risk_levels[min(int(prediction), 3)]
             
-            indicators = await get_real_time_indicators(zone["zone"])
-            
-            await db.risk_zones.update_one(
-                {"id": zone["id"]},
-                {"$set": {
-                    "riskLevel": risk_level,
-                    "confidence": int(confidence * 100),
-                    "indicators": indicators,
-                    "population": mapping["pop"],
-                    "lat": mapping["lat"],
-                    "lng": mapping["lng"],
-                    "lastUpdate": datetime.now().strftime("%I:%M %p")
-                }}
-            )
+            seismic = seismic_by_zone.get(str(zone["id"])) if seismic_by_zone is not None else None
+            indicators = await get_real_time_indicators(zone["zone"], weather=weather, seismic=seismic)
+
+            update = {
+                "riskLevel": risk_level,
+                "confidence": int(confidence * 100),
+                "indicators": indicators,
+                "population": mapping["population"],
+                "lat": mapping["lat"],
+                "lng": mapping["lng"],
+                "lastUpdate": datetime.now().strftime("%I:%M %p")
+            }
+            # Keep the last known seismic features if the feed was unavailable
+            if seismic is not None:
+                update["seismic"] = seismic
+            await db.risk_zones.update_one({"id": zone["id"]}, {"$set": update})
+            updated += 1
+            # lastUpdate moves on every run; only push zones whose data changed
+            if any(zone.get(k) != v for k, v in update.items() if k != "lastUpdate"):
+                changed.append({**zone, **update})
         except Exception as e:
             print(f"Error updating zone {zone['zone']}: {e}")
 
+    if updated:
+        snapshot_store.invalidate("risk-zones")
+        publish_zone_changes(changed)
+    elif cities:
+        raise RefreshFailed(f"None of {len(zones)} risk zones could be updated")
+
+def publish_zone_changes(zones: List[Dict[str, Any]]):
+    """
+    Push changed zones to /risk-zones/stream subscribers, encoded once for all.
+    A zone that doesn't fit the RiskZone schema (e.g. a legacy document) is
+    logged and left out rather than failing the caller.
+    """
+    valid = []
+    for zone in zones:
+        try:
+            valid.append(RiskZone.model_validate(zone))
+        except ValidationError as e:
+            print(f"Not pushing zone {zone.get('id')}: {e}")
+    if not valid:
+        return
+    zone_broadcaster.publish("zones", None, encoded=_risk_zone_list.dump_json(valid))
+
 async def update_forecasts():
     db = db_client.db
-    if not db:
-        print("Database not connected")
-        return
+    if db is None:
+        raise RefreshFailed("Database not connected")
+
+    # Collect every forecast slot of every zone as columns, then score them in one call
+    slot_times = []
+    slot_rows = []
 
-    all_predictions = []
+    catalog = await ensure_zone_catalog()
+    located = [z for z in catalog.zones if z.get("city")]
+    forecast_by_city = await fetch_many(fetch_forecast_data, [z["city"] for z in located])
     
-    for zone, mapping in ZONE_CITY_MAPPING.items():
+    for mapping in located:
+        zone = mapping["zone"]
         city = mapping["city"]
-        forecast_data = await fetch_forecast_data(city)
+        forecast_data = forecast_by_city[city]
         if "list" not in forecast_data:
             print(f"Error fetching forecast for {city}: {forecast_data.get('error', 'Unknown error')}")
             continue
@@ -92,117 +165,190 @@ async def update_forecasts():
             
             # Note: risk_cluster is expected by the model but not used for prediction (only first 6)
             # precip_mm: openweather provides 'rain' or 'snow' objects
-            precip = 0
-            if "rain" in item:
-                precip = item["rain"].get("3h", 0)
-            elif "snow" in item:
-                precip = item["snow"].get("3h", 0)
-
-            input_data = {
-                "temperature_celsius": item["main"]["temp"],
-                "feels_like_celsius": item["main"]["feels_like"],
-                "humidity": item["main"]["humidity"],
-                "precip_mm": precip,
-                "wind_kph": item["wind"]["speed"] * 3.6, # convert m/s to kph
-                "cloud": item["clouds"]["all"],
-                "risk_cluster": 0 # Placeholder
-            }
-            
             try:
-                prediction, confidence = model_handler.predict(input_data)
-                
-                all_predictions.append({
-                    "zone": zone,
-                    "timestamp": item["dt"],
-                    "dt_txt": item["dt_txt"],
-                    "risk_level": int(prediction),
-                    "confidence": int(confidence * 100)
-                })
-            except Exception as e:
-                print(f"Prediction error for {zone}: {e}")
-
-    if not all_predictions:
-        return
+                # OpenWeather's dt is the slot start in UTC seconds, the same instant as dt_txt
+                slot_time = int(item["dt"])
+                precip = 0
+                if "rain" in item:
+                    precip = item["rain"].get("3h", 0)
+                elif "snow" in item:
+                    precip = item["snow"].get("3h", 0)
 
-    # 1. 24h Forecast (Aggregate first 8 slots - 24 hours)
-    # We'll take the average risk across zones for each time slot
-    forecast_24h = []
-    time_slots = sorted(list(set(p["dt_txt"] for p in all_predictions)))[:7] # Take 7 slots for the chart
-    
-    for ts in time_slots:
-        slot_predictions = [p for p in all_predictions if p["dt_txt"] == ts]
-        avg_risk = sum(p["risk_level"] for p in slot_predictions) / len(slot_predictions)
-        avg_conf = sum(p["confidence"] for p in slot_predictions) / len(slot_predictions)
-        
-        # Convert "2023-10-27 12:00:00" to "12:00"
-        hour = ts.split(" ")[1][:5]
-        
-        forecast_24h.append({
-            "hour": hour,
-            "risk": int(avg_risk * 33), # Map 0-3 to 0-100 roughly
-            "confidence": int(avg_conf)
-        })
+                slot_rows.append([
+                    item["main"]["temp"],
+                    item["main"]["feels_like"],
+                    item["main"]["humidity"],
+                    precip,
+                    item["wind"]["speed"] * 3.6, # convert m/s to kph
+                    item["clouds"]["all"],
+                    0 # risk_cluster placeholder
+                ])
+                slot_times.append(slot_time)
+            except (KeyError, TypeError) as e:
+                print(f"Skipping malformed forecast slot for {zone}: {e}")
+
+    if not slot_rows:
+        raise RefreshFailed(f"No forecast data fetched for {len(forecast_by_city)} cities")
+
+    try:
+        labels, confidences, _ = await inference_executor.predict_many(
+            np.array(slot_rows, dtype=np.float64), bounded=False
+        )
+    except Exception as e:
+        raise RefreshFailed(f"Prediction error for forecasts: {e}")
+
+    forecast_24h, forecast_3day, forecast_7day = aggregate_forecasts(
+        np.array(slot_times, dtype="datetime64[s]"),
+        labels.astype(np.int64),
+        (confidences * 100).astype(np.int64),
+        datetime.now().date(),
+    )
+
+    # Publish as a new snapshot version; readers switch over atomically
+    await publish_forecast_snapshot(db, forecast_24h, forecast_3day, forecast_7day)
+    snapshot_store.invalidate("forecast")
+
+    print("Forecasts updated successfully with real data")
 
-    # 2. 3day Forecast
-    # Count zones in each risk category for next 3 days
+def aggregate_forecasts(slot_times: np.ndarray, risk_levels: np.ndarray, confidences: np.ndarray,
+                        today: date) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Summarise per-(zone, slot) predictions into the 24h, 3-day and 7-day
+    forecasts. Inputs are parallel arrays: slot start times (datetime64),
+    integer risk levels and confidences in whole percent. Predictions are
+    grouped once by slot and once by day, so cost grows linearly with the
+    number of zones.
+    """
+    # 1. 24h: average risk across zones for each of the first 7 time slots
+    slots, slot_index = np.unique(slot_times, return_inverse=True)
+    slot_counts = np.bincount(slot_index)
+    slot_risk = np.bincount(slot_index, weights=risk_levels) / slot_counts
+    slot_confidence = np.bincount(slot_index, weights=confidences) / slot_counts
+
+    forecast_24h = [
+        {
+            "hour": str(slot)[11:16],  # "2023-10-27T12:00:00" -> "12:00"
+            "risk": int(avg_risk * 33),  # Map 0-3 to 0-100 roughly
+            "confidence": int(avg_conf),
+        }
+        for slot, avg_risk, avg_conf in zip(slots[:7], slot_risk[:7], slot_confidence[:7])
+    ]
+
+    # Per-day averages and safe (0) / moderate (1) / high (2+) counts
+    days, day_index = np.unique(slot_times.astype("datetime64[D]"), return_inverse=True)
+    day_risk = np.bincount(day_index, weights=risk_levels) / np.bincount(day_index)
+    bands = np.clip(risk_levels, 0, 2)
+    band_counts = np.bincount(day_index * 3 + bands, minlength=len(days) * 3).reshape(len(days), 3)
+
+    # 2. 3day: zones in each risk category for today and the next 2 days
     forecast_3day = []
-    days = ["Today", "Tomorrow", "Day 3"]
-    now = datetime.now()
-    
-    for i in range(3):
-        target_date = (now + timedelta(days=i)).strftime("%Y-%m-%d")
-        day_predictions = [p for p in all_predictions if p["dt_txt"].startswith(target_date)]
-        
-        if not day_predictions:
+    for i, name in enumerate(["Today", "Tomorrow", "Day 3"]):
+        target = np.datetime64(today + timedelta(days=i), "D")
+        pos = np.searchsorted(days, target)
+        if pos < len(days) and days[pos] == target:
+            safe, moderate, high = band_counts[pos].tolist()
+        else:
             # Fallback for "Day 3" if not enough data
-            forecast_3day.append({"day": days[i], "safe": 0, "moderate": 0, "high": 0})
-            continue
+            safe = moderate = high = 0
+        forecast_3day.append({"day": name, "safe": safe, "moderate": moderate, "high": high})
 
-        safe = len([p for p in day_predictions if p["risk_level"] == 0])
-        moderate = len([p for p in day_predictions if p["risk_level"] == 1])
-        high = len([p for p in day_predictions if p["risk_level"] >= 2])
-        
-        forecast_3day.append({
-            "day": days[i],
-            "safe": safe,
-            "moderate": moderate,
-            "high": high
-        })
-
-    # 3. 7day Forecast (Actually 5 days from OpenWeather)
-    forecast_7day = []
-    # OpenWeather only gives 5 days, so we'll show 5 days
+    # 3. 7day (OpenWeather only gives 5 days, so this is one entry per day available)
     day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    
-    unique_dates = sorted(list(set(p["dt_txt"].split(" ")[0] for p in all_predictions)))
-    
-    for date_str in unique_dates:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        day_name = day_names[date_obj.weekday()]
-        
-        day_preds = [p for p in all_predictions if p["dt_txt"].startswith(date_str)]
-        avg_risk = sum(p["risk_level"] for p in day_preds) / len(day_preds)
-        
+    forecast_7day = []
+    for day, avg_risk in zip(days, day_risk):
         risk_index = int(avg_risk * 33)
         trend = "stable"
         if risk_index > 60: trend = "critical"
         elif risk_index > 40: trend = "rising"
         elif risk_index < 20: trend = "declining"
-        
+
         forecast_7day.append({
-            "day": day_name,
+            "day": day_names[day.item().weekday()],
             "riskIndex": risk_index,
             "trend": trend
         })
 
-    # Update Database
-    await db.forecasts_24h.delete_many({})
-    await db.forecasts_24h.insert_many(forecast_24h)
-    
-    await db.forecasts_3day.delete_many({})
-    await db.forecasts_3day.insert_many(forecast_3day)
-    
-    await db.forecasts_7day.delete_many({})
-    await db.forecasts_7day.insert_many(forecast_7day)
+    return forecast_24h, forecast_3day, forecast_7day
 
-    print("Forecasts updated successfully with real data")
+async def publish_forecast_snapshot(db, forecast_24h, forecast_3day, forecast_7day) -> int:
+    """
+    Write all three forecasts as one versioned snapshot document, then move
+    the "current" pointer to it. Both writes are single-document and atomic,
+    so readers see either the previous snapshot or the new one, never a
+    partial one. The pointer only moves forward, so a slower publisher can't
+    replace a newer snapshot. Only the last FORECAST_SNAPSHOT_RETENTION
+    versions are kept.
+    """
+    sequence = await db.forecast_meta.find_one_and_update(
+        {"_id": "sequence"},
+        {"$inc": {"value": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    version = sequence["value"]
+    now = datetime.utcnow()
+
+    await db.forecast_snapshots.insert_one({
+        "_id": version,
+        "createdAt": now,
+        FORECAST_SNAPSHOT_FIELDS["24h"]: forecast_24h,
+        FORECAST_SNAPSHOT_FIELDS["3day"]: forecast_3day,
+        FORECAST_SNAPSHOT_FIELDS["7day"]: forecast_7day,
+    })
+    try:
+        await db.forecast_meta.update_one(
+            {"_id": "current", "version": {"$lt": version}},
+            {"$set": {"version": version, "updatedAt": now}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The pointer already names a newer version; the upsert had nothing to create
+        print(f"Forecast snapshot {version} superseded before it was published")
+    await db.forecast_snapshots.delete_many(
+        {"_id": {"$lte": version - FORECAST_SNAPSHOT_RETENTION}}
+    )
+    return version
+
+async def get_forecast_snapshot(horizon: str) -> Dict[str, Any]:
+    """
+    Load one horizon ("24h", "3day" or "7day") of the current snapshot.
+    Returns {"version", "updatedAt", "items"}; items is empty if no snapshot
+    has been published yet.
+    """
+    snapshot = {"version": None, "updatedAt": None, "items": []}
+    db = db_client.db
+    if db is None:
+        return snapshot
+
+    meta = await db.forecast_meta.find_one({"_id": "current"})
+    if not meta or meta.get("version") is None:
+        return snapshot
+
+    field = FORECAST_SNAPSHOT_FIELDS[horizon]
+    doc = await db.forecast_snapshots.find_one({"_id": meta["version"]}, {field: 1})
+    if doc:
+        snapshot.update(version=meta["version"], updatedAt=meta.get("updatedAt"), items=doc.get(field, []))
+    return snapshot
+
+def schedule_forecast_refresh(retries: Optional[int] = None) -> asyncio.Task:
+    """
+    Queue a forecast refresh on the scheduler; joins a run already in progress.
+    """
+    return refresh_scheduler.trigger("forecasts", retries)
+
+def schedule_risk_zone_refresh(retries: Optional[int] = None) -> asyncio.Task:
+    """
+    Queue a risk zone refresh on the scheduler; joins a run already in progress.
+    """
+    return refresh_scheduler.trigger("risk_zones", retries)
+
+def get_snapshot_age(updated_at: Optional[datetime]) -> Optional[int]:
+    """
+    Seconds since a snapshot was published, or None if unknown.
+    """
+    if updated_at is None:
+        return None
+    return max(int((datetime.utcnow() - updated_at).total_seconds()), 0)
+
+refresh_scheduler.add_job("risk_zones", update_risk_zones, RISK_ZONE_REFRESH_INTERVAL)
+refresh_scheduler.add_job("forecasts", update_forecasts, FORECAST_REFRESH_INTERVAL)
@@ -0,0 +1,94 @@
+import os
+import importlib.util
+import httpx
+from typing import Dict, Any
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", os.getenv("FETCH_TIMEOUT_SECONDS", "10")))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+class HTTPClient:
+    client: httpx.AsyncClient = None
+    requests: int = 0
+    connections_opened: int = 0
+
+http_client = HTTPClient()
+
+async def _trace(event_name: str, info: Dict[str, Any]):
+    # httpcore reports every new TCP connection; anything else was served from the pool
+    if event_name == "connection.connect_tcp.complete":
+        http_client.connections_opened += 1
+
+async def _on_request(request: httpx.Request):
+    http_client.requests += 1
+    request.extensions["trace"] = _trace
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Build the pooled client used for all outbound API calls.
+    Extra kwargs (e.g. `transport`) are passed through to httpx.
+    """
+    options = {
+        "http2": HTTP2_AVAILABLE,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT, pool=HTTP_POOL_TIMEOUT),
+        "event_hooks": {"request": [_on_request]},
+    }
+    options.update(kwargs)
+    return httpx.AsyncClient(**options)
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, creating it on first use outside the app
+    lifecycle (e.g. from seed_db.py).
+    """
+    if http_client.client is None or http_client.client.is_closed:
+        http_client.client = create_http_client()
+    return http_client.client
+
+async def open_http_client(**kwargs):
+    await close_http_client()
+    http_client.client = create_http_client(**kwargs)
+
+async def close_http_client():
+    if http_client.client is not None:
+        await http_client.client.aclose()
+        http_client.client = None
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Snapshot of connection pool usage for the shared client.
+    """
+    connections = []
+    client = http_client.client
+    if client is not None and not client.is_closed:
+        pool = getattr(client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+
+    idle = sum(1 for c in connections if c.is_idle())
+    reused = max(http_client.requests - http_client.connections_opened, 0)
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "maxConnections": HTTP_MAX_CONNECTIONS,
+        "maxKeepaliveConnections": HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "openConnections": len(connections),
+        "activeConnections": len(connections) - idle,
+        "idleConnections": idle,
+        "requests": http_client.requests,
+        "connectionsOpened": http_client.connections_opened,
+        "reusedConnections": reused,
+        "reuseRatio": round(reused / http_client.requests, 3) if http_client.requests else 0.0,
+    }
@@ -0,0 +1,196 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from app.utils.model_registry import active_version, load_bundle
+from app.utils.prediction import ModelBundle, ModelHandler, model_handler, rows_to_matrix
+
+# "inline" scores on the event loop (old behaviour), "thread" in a thread pool,
+# "process" in a pool of worker processes that each hold their own model
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Requests allowed to wait for a worker before new ones are rejected with 503
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))
+LATENCY_WINDOW = 1024
+
+class InferenceOverloaded(Exception):
+    pass
+
+# Per-process model for the process pool, loaded once by the initializer
+_worker_handler: Optional[ModelHandler] = None
+
+def init_model_worker():
+    global _worker_handler
+    _worker_handler = ModelHandler(lazy=False)
+
+def _warm_worker() -> Optional[str]:
+    return _worker_handler.version if _worker_handler else None
+
+def score_in_worker(matrix: np.ndarray, version: Optional[str]) -> Tuple[np.ndarray, np.ndarray, str]:
+    # Follow hot swaps made in the parent process
+    if version is not None and _worker_handler.version != version:
+        _worker_handler.swap(load_bundle(version))
+    bundle = _worker_handler.current()
+    labels, confidences = bundle.predict_many(matrix)
+    return labels, confidences, bundle.version
+
+class InferenceExecutor:
+    """
+    Runs model scoring off the event loop. At most `workers + max_queue`
+    calls may be outstanding; beyond that callers get InferenceOverloaded
+    instead of queueing without bound.
+    """
+
+    def __init__(self, kind: str = INFERENCE_EXECUTOR, workers: int = INFERENCE_WORKERS,
+                 max_queue: int = INFERENCE_MAX_QUEUE):
+        self.kind = kind
+        self.workers = max(workers, 1)
+        self.max_queue = max_queue
+        self.pool: Optional[Executor] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        # Versions the process workers reported loading in warm_up()
+        self.worker_versions = []
+
+    @property
+    def model_loaded(self) -> bool:
+        if self.kind == "process":
+            return bool(self.worker_versions) and all(self.worker_versions)
+        return model_handler.loaded
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self.in_flight - self.workers, 0) if self.kind != "inline" else 0
+
+    def start(self):
+        if self.pool is not None or self.kind == "inline":
+            return
+        if self.kind == "process":
+            # spawn: forking a process that runs an event loop and Mongo client is unsafe
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_model_worker,
+            )
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+
+    async def warm_up(self):
+        """
+        Start the pool and load the model now: in every process worker, or
+        in a thread for the other kinds.
+        """
+        self.start()
+        if self.kind == "process":
+            loop = asyncio.get_running_loop()
+            self.worker_versions = await asyncio.gather(
+                *(loop.run_in_executor(self.pool, _warm_worker) for _ in range(self.workers))
+            )
+        else:
+            await asyncio.to_thread(model_handler.ensure_loaded)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def predict_many(self, rows, bounded: bool = True,
+                           use_cache: bool = True) -> Tuple[np.ndarray, np.ndarray, str]:
+        """
+        Score rows (matrix or list of feature dicts). Returns (labels,
+        confidences, model_version). Rows in the prediction cache are
+        answered without using a worker unless use_cache=False. Internal
+        jobs pass bounded=False to wait instead of being rejected.
+        """
+        matrix = np.atleast_2d(rows if isinstance(rows, np.ndarray) else rows_to_matrix(rows))
+        # Pin the version so a concurrent swap can't change it mid-call
+        bundle, version = await self._pin()
+        cache = model_handler.prediction_cache
+        if use_cache:
+            keys, cached, misses = cache.lookup(version, matrix)
+        else:
+            keys, cached, misses = [], [], list(range(len(matrix)))
+        if not misses:
+            labels, confidences = cache.store(keys, cached, misses, np.empty(0), np.empty(0))
+            return labels, confidences, version
+
+        if bounded and self.kind != "inline" and self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise InferenceOverloaded("Inference queue is full")
+
+        self.start()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            labels, confidences, version = await self._run(bundle, version, matrix[misses] if keys else matrix)
+            self.completed += 1
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.latencies.append(time.perf_counter() - start)
+        labels, confidences = cache.store(keys, cached, misses, labels, confidences)
+        return labels, confidences, version
+
+    async def predict(self, input_data: dict, bounded: bool = True):
+        labels, confidences, version = await self.predict_many(rows_to_matrix([input_data]), bounded)
+        return labels[0], float(confidences[0]), version
+
+    async def _pin(self) -> Tuple[Optional[ModelBundle], str]:
+        """
+        The bundle and version to score with. Process workers hold their own
+        models, so the parent only resolves the active version from the
+        registry and never loads one; the other kinds load off the event loop.
+        """
+        if self.kind == "process":
+            return None, active_version()
+        if not model_handler.loaded:
+            # First call before warm-up got to it
+            await asyncio.to_thread(model_handler.ensure_loaded)
+        bundle = model_handler.current()
+        return bundle, bundle.version
+
+    async def _run(self, bundle: Optional[ModelBundle], version: str, matrix: np.ndarray):
+        if self.kind == "process":
+            # Workers load whichever version the parent pinned, so they follow hot swaps
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, score_in_worker, matrix, version)
+
+        if self.kind == "inline":
+            labels, confidences = bundle.predict_many(matrix)
+        else:
+            loop = asyncio.get_running_loop()
+            labels, confidences = await loop.run_in_executor(self.pool, bundle.predict_many, matrix)
+        return labels, confidences, bundle.version
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "inFlight": self.in_flight,
+            "queueDepth": self.queue_depth,
+            "peakInFlight": self.peak_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latencyMs": {
+                "mean": round(float(latencies.mean()), 3),
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p95": round(float(np.percentile(latencies, 95)), 3),
+                "p99": round(float(np.percentile(latencies, 99)), 3),
+            },
+        }
+
+inference_executor = InferenceExecutor()
@@ -0,0 +1,107 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from app.utils.prediction import FEATURES
+from app.utils.inference_executor import inference_executor
+
+# How long the first request of a batch may wait for others to join it
+PREDICT_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "2"))
+# Flush as soon as this many requests are waiting; 1 disables coalescing
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+
+ScoreFunc = Callable[[np.ndarray], Awaitable[Tuple[np.ndarray, np.ndarray, str]]]
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one batch call. A batch
+    is scored when it reaches `max_size` rows or `max_wait` seconds after
+    its first row arrived, and each caller gets its own row's result.
+    """
+
+    def __init__(self, score: ScoreFunc, max_wait: float, max_size: int):
+        self.score = score
+        self.max_wait = max_wait
+        self.max_size = max(max_size, 1)
+        self.pending: List[Tuple[List[float], asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        # Strong references so running batches aren't garbage collected
+        self.running = set()
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_seen = 0
+        self.size_flushes = 0
+        self.timer_flushes = 0
+
+    async def predict(self, input_data: dict) -> Tuple[Any, float, str]:
+        """
+        Returns (prediction, confidence, model_version) for one feature dict.
+        """
+        row = [input_data[f] for f in FEATURES]
+        if self.max_size == 1:
+            labels, confidences, version = await self.score(np.array([row], dtype=np.float64))
+            return labels[0], float(confidences[0]), version
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((row, future))
+        if len(self.pending) >= self.max_size:
+            self.size_flushes += 1
+            self._flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_wait, self._flush_on_timer)
+        return await future
+
+    def _flush_on_timer(self):
+        self.timer = None
+        self.timer_flushes += 1
+        self._flush()
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._score_batch(batch))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    async def _score_batch(self, batch: List[Tuple[List[float], asyncio.Future]]):
+        self.batches += 1
+        self.rows += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        matrix = np.array([row for row, _ in batch], dtype=np.float64)
+        try:
+            labels, confidences, version = await self.score(matrix)
+        except Exception as e:
+            # Overload and scoring errors reach every caller in the batch
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), label, confidence in zip(batch, labels, confidences):
+            # A caller whose request was cancelled no longer wants its result
+            if not future.done():
+                future.set_result((label, float(confidence), version))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "maxWaitMs": self.max_wait * 1000,
+            "maxSize": self.max_size,
+            "pending": len(self.pending),
+            "batches": self.batches,
+            "rows": self.rows,
+            "meanBatchSize": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "maxBatchSize": self.max_batch_seen,
+            "sizeFlushes": self.size_flushes,
+            "timerFlushes": self.timer_flushes,
+        }
+
+prediction_batcher = MicroBatcher(
+    inference_executor.predict_many,
+    max_wait=PREDICT_BATCH_MAX_WAIT_MS / 1000,
+    max_size=PREDICT_BATCH_MAX_SIZE,
+)
@@ -0,0 +1,270 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import joblib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.prediction import (
+    BASE_DIR,
+    FEATURES,
+    MODEL_MMAP,
+    MODEL_PATH,
+    SCALER_PATH,
+    ModelBundle,
+    model_handler,
+)
+from app.utils.scheduler import refresh_scheduler
+from app.utils.snapshot_store import snapshot_store
+
+# Each version lives in MODEL_REGISTRY_DIR/<version>/ with scaler.pkl,
+# pronezone_model.pkl and an optional manifest.json of sha256 checksums.
+# The artifacts at the project root are exposed as version "default".
+MODEL_REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", str(BASE_DIR / "models")))
+ACTIVE_POINTER_PATH = MODEL_REGISTRY_DIR / "active.json"
+DEFAULT_VERSION = "default"
+SCALER_FILENAME = "scaler.pkl"
+MODEL_FILENAME = "pronezone_model.pkl"
+MANIFEST_FILENAME = "manifest.json"
+
+# Optional CSV of FEATURES (+ optional "risk_level" label) used to vet a version before activation
+MODEL_HOLDOUT_PATH = Path(os.getenv("MODEL_HOLDOUT_PATH", str(MODEL_REGISTRY_DIR / "holdout.csv")))
+MODEL_MIN_HOLDOUT_ACCURACY = float(os.getenv("MODEL_MIN_HOLDOUT_ACCURACY", "0"))
+# How often each worker checks the shared pointer for a version activated elsewhere
+MODEL_SYNC_INTERVAL = float(os.getenv("MODEL_SYNC_INTERVAL", "30"))
+
+class ModelValidationError(Exception):
+    pass
+
+_activation_lock = asyncio.Lock()
+
+# (pointer path, mtime) -> the version it resolved to, so the request path doesn't re-read it
+_resolved_pointer: Tuple[Any, str] = (None, DEFAULT_VERSION)
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _artifact_paths(version: str):
+    if version == DEFAULT_VERSION:
+        return SCALER_PATH, MODEL_PATH
+    if not re.fullmatch(r"[\w.-]+", version) or version.startswith("."):
+        raise FileNotFoundError(f"Invalid model version name: {version}")
+    version_dir = MODEL_REGISTRY_DIR / version
+    return version_dir / SCALER_FILENAME, version_dir / MODEL_FILENAME
+
+def _read_manifest(version: str) -> Dict[str, Any]:
+    if version == DEFAULT_VERSION:
+        return {}
+    manifest_path = MODEL_REGISTRY_DIR / version / MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def write_manifest(version: str) -> Dict[str, Any]:
+    """
+    Record checksums for a version directory's artifacts.
+    """
+    scaler_path, model_path = _artifact_paths(version)
+    manifest = {
+        "version": version,
+        "createdAt": datetime.utcnow().isoformat(),
+        "checksums": {
+            SCALER_FILENAME: file_checksum(scaler_path),
+            MODEL_FILENAME: file_checksum(model_path),
+        },
+    }
+    with open(MODEL_REGISTRY_DIR / version / MANIFEST_FILENAME, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def _read_pointer() -> Dict[str, Any]:
+    if not ACTIVE_POINTER_PATH.exists():
+        return {}
+    with open(ACTIVE_POINTER_PATH) as f:
+        return json.load(f)
+
+def _write_pointer(active: str, history: List[str]):
+    MODEL_REGISTRY_DIR.mkdir(parents=True, exist_ok=True)
+    # Write then rename so other workers never read a half-written pointer
+    tmp_path = ACTIVE_POINTER_PATH.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"active": active, "history": history, "updatedAt": datetime.utcnow().isoformat()}, f)
+    os.replace(tmp_path, ACTIVE_POINTER_PATH)
+
+def list_versions() -> List[Dict[str, Any]]:
+    versions = []
+    candidates = [DEFAULT_VERSION]
+    # Process-pool parents never load a model, so fall back to the pointer
+    active = model_handler.version or active_version()
+    if MODEL_REGISTRY_DIR.exists():
+        candidates += sorted(p.name for p in MODEL_REGISTRY_DIR.iterdir() if p.is_dir())
+
+    for version in candidates:
+        scaler_path, model_path = _artifact_paths(version)
+        if not (scaler_path.exists() and model_path.exists()):
+            continue
+        manifest = _read_manifest(version)
+        versions.append({
+            "version": version,
+            "active": version == active,
+            "createdAt": manifest.get("createdAt"),
+            "checksums": manifest.get("checksums", {}),
+        })
+    return versions
+
+def load_bundle(version: str) -> ModelBundle:
+    """
+    Load a version's artifacts, verifying them against its manifest if it has one.
+    """
+    scaler_path, model_path = _artifact_paths(version)
+    if not (scaler_path.exists() and model_path.exists()):
+        raise FileNotFoundError(f"Model files not found at {scaler_path} or {model_path}")
+
+    checksums = {SCALER_FILENAME: file_checksum(scaler_path), MODEL_FILENAME: file_checksum(model_path)}
+    expected = _read_manifest(version).get("checksums", {})
+    for name, checksum in expected.items():
+        if checksums.get(name) != checksum:
+            raise ModelValidationError(f"Checksum mismatch for {version}/{name}")
+
+    mmap_mode = "r" if MODEL_MMAP else None
+    scaler = joblib.load(scaler_path, mmap_mode=mmap_mode)
+    model = joblib.load(model_path, mmap_mode=mmap_mode)
+    return ModelBundle(version, scaler, model, checksums)
+
+def _holdout_batch(bundle: ModelBundle):
+    if MODEL_HOLDOUT_PATH.exists():
+        df = pd.read_csv(MODEL_HOLDOUT_PATH)
+        labels = df["risk_level"].to_numpy() if "risk_level" in df.columns else None
+        return df[FEATURES].to_numpy(dtype=np.float64), labels
+    # No holdout file: probe around the scaler's training distribution
+    mean = np.asarray(bundle.scaler.mean_, dtype=np.float64)
+    scale = np.asarray(bundle.scaler.scale_, dtype=np.float64)
+    offsets = np.array([-2.0, -1.0, 0.0, 1.0, 2.0])[:, None]
+    return mean + offsets * scale, None
+
+def validate_bundle(bundle: ModelBundle) -> Dict[str, Any]:
+    """
+    Score the holdout batch with a candidate bundle and reject it if it errors,
+    returns malformed output or falls below MODEL_MIN_HOLDOUT_ACCURACY.
+    """
+    matrix, expected = _holdout_batch(bundle)
+    try:
+        labels, confidences = bundle.predict_many(matrix)
+    except Exception as e:
+        raise ModelValidationError(f"Holdout scoring failed: {e}")
+
+    if len(labels) != len(matrix) or not np.all((confidences >= 0) & (confidences <= 1)):
+        raise ModelValidationError("Holdout scoring returned malformed output")
+
+    report = {"rows": len(matrix), "backend": bundle.backend}
+    if bundle.compiled is not None:
+        expected_proba = bundle._sklearn_predict_proba(matrix)
+        if not np.allclose(bundle.compiled.predict_proba(matrix), expected_proba, rtol=0, atol=1e-9):
+            raise ModelValidationError("Compiled model disagrees with sklearn on the holdout batch")
+    if expected is not None:
+        accuracy = float(np.mean(labels.astype(str) == expected.astype(str)))
+        report["accuracy"] = round(accuracy, 4)
+        if accuracy < MODEL_MIN_HOLDOUT_ACCURACY:
+            raise ModelValidationError(
+                f"Holdout accuracy {accuracy:.3f} is below {MODEL_MIN_HOLDOUT_ACCURACY:.3f}"
+            )
+    return report
+
+def active_version() -> str:
+    """
+    The version the pointer names, falling back to "default" if there is no
+    pointer or its version's files are missing. The pointer is only re-read
+    after it changes, so this is cheap enough to call per request.
+    """
+    global _resolved_pointer
+    try:
+        stamp = (ACTIVE_POINTER_PATH, ACTIVE_POINTER_PATH.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return DEFAULT_VERSION
+    if _resolved_pointer[0] == stamp:
+        return _resolved_pointer[1]
+
+    version = _read_pointer().get("active", DEFAULT_VERSION)
+    try:
+        found = version == DEFAULT_VERSION or all(p.exists() for p in _artifact_paths(version))
+    except FileNotFoundError:
+        found = False
+    if not found:
+        print(f"Model version {version} not found; falling back to {DEFAULT_VERSION}")
+        version = DEFAULT_VERSION
+    _resolved_pointer = (stamp, version)
+    return version
+
+def load_active_bundle() -> Optional[ModelBundle]:
+    """
+    Load whichever version the pointer names, falling back to "default".
+    """
+    version = active_version()
+    try:
+        return load_bundle(version)
+    except FileNotFoundError as e:
+        print(e)
+        return None
+
+async def _activate(version: str, persist: bool) -> Dict[str, Any]:
+    # Callers hold _activation_lock
+    bundle = await asyncio.to_thread(load_bundle, version)
+    report = await asyncio.to_thread(validate_bundle, bundle)
+    previous = model_handler.swap(bundle)
+    # Feature importance comes from the active model
+    snapshot_store.invalidate("explain")
+
+    if persist:
+        history = _read_pointer().get("history", [])
+        if previous is not None and previous.version != version:
+            history = (history + [previous.version])[-10:]
+        _write_pointer(version, history)
+
+    return {
+        "version": version,
+        "previous": previous.version if previous else None,
+        "validation": report,
+    }
+
+async def activate_version(version: str, persist: bool = True) -> Dict[str, Any]:
+    """
+    Load and validate `version` in a worker thread, then swap it in.
+    Predictions already running finish on the bundle they started with.
+    """
+    async with _activation_lock:
+        return await _activate(version, persist)
+
+async def rollback_version() -> Dict[str, Any]:
+    """
+    Re-activate the version that was active before the current one.
+    """
+    # The pointer is read and rewritten under the lock, so a concurrent
+    # activation can't land in between and be overwritten
+    async with _activation_lock:
+        history = _read_pointer().get("history", [])
+        if not history:
+            raise ModelValidationError("No previous model version to roll back to")
+        target = history[-1]
+        result = await _activate(target, persist=False)
+        _write_pointer(target, history[:-1])
+        return result
+
+async def sync_active_version():
+    """
+    Pick up a version another worker activated through the shared pointer.
+    """
+    async with _activation_lock:
+        version = _read_pointer().get("active")
+        if version and model_handler.loaded and version != model_handler.version:
+            await _activate(version, persist=False)
+
+refresh_scheduler.add_job("model_sync", sync_active_version, MODEL_SYNC_INTERVAL)
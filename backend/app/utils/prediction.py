@@ -1,7 +1,14 @@
-import joblib
+import math
+import numpy as np
 import pandas as pd
 import os
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.cache import TTLCache
+from app.utils.compiled_model import compile_model, probe_rows
 
 # Base directory of the project
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -9,39 +16,101 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 SCALER_PATH = BASE_DIR / "scaler.pkl"
 MODEL_PATH = BASE_DIR / "pronezone_model.pkl"
 
-class ModelHandler:
-    def __init__(self):
-        self.scaler = None
-        self.model = None
-        self.load_models()
+# Memory-map large estimator arrays instead of copying them into each process
+MODEL_MMAP = os.getenv("MODEL_MMAP", "false").lower() == "true"
 
-    def load_models(self):
-        if SCALER_PATH.exists() and MODEL_PATH.exists():
-            try:
-                self.scaler = joblib.load(SCALER_PATH)
-                self.model = joblib.load(MODEL_PATH)
-            except Exception as e:
-                print(f"Error loading models: {e}")
-        else:
-            print(f"Model files not found at {SCALER_PATH} or {MODEL_PATH}")
+# "sklearn" runs the pickled estimators; "compiled" evaluates supported tree
+# models with the pure-NumPy engine in compiled_model.py (falls back to sklearn)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "sklearn").lower()
+# Above this many rows sklearn's Cython tree walk beats the NumPy traversal
+COMPILED_MAX_BATCH_ROWS = int(os.getenv("COMPILED_MAX_BATCH_ROWS", "512"))
+
+# Cache of recent predictions keyed on rounded features; 0 disables it
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))
+# Decimal places features are rounded to before lookup; inputs that agree
+# to this precision share one cached result
+PREDICTION_CACHE_DECIMALS = int(os.getenv("PREDICTION_CACHE_DECIMALS", "2"))
+
+# Feature order expected by the scaler (the model only uses the first 6)
+FEATURES = ['temperature_celsius', 'feels_like_celsius', 'humidity',
+            'precip_mm', 'wind_kph', 'cloud', 'risk_cluster']
+MODEL_FEATURE_COUNT = 6
+
+def rows_to_matrix(rows) -> np.ndarray:
+    """
+    Convert a list of feature dicts into an (N, len(FEATURES)) float matrix.
+    """
+    return np.array([[row[f] for f in FEATURES] for row in rows], dtype=np.float64)
+
+def ensure_finite(matrix: np.ndarray):
+    """
+    Raise ValueError if any feature is NaN or infinite. The compiled engine
+    and sklearn don't route those the same way, so neither gets to see them.
+    """
+    finite = np.isfinite(matrix).all(axis=1)
+    if not finite.all():
+        raise ValueError(f"Non-finite feature value in row {int(np.argmin(finite))}")
+
+class ModelBundle:
+    """
+    One immutable scaler + model pair. Callers that hold a bundle keep
+    scoring with it even if the handler swaps to a newer version meanwhile.
+    """
+
+    def __init__(self, version: str, scaler, model, checksums: Optional[Dict[str, str]] = None,
+                 backend: Optional[str] = None):
+        self.version = version
+        self.scaler = scaler
+        self.model = model
+        self.checksums = checksums or {}
+        self.loaded_at = datetime.utcnow()
+        self.compiled = None
+        if (backend or INFERENCE_BACKEND) == "compiled":
+            self.compiled = self._compile()
+
+    @property
+    def backend(self) -> str:
+        return "compiled" if self.compiled is not None else "sklearn"
+
+    def _compile(self):
+        try:
+            compiled = compile_model(self.scaler, self.model, MODEL_FEATURE_COUNT)
+        except Exception as e:
+            print(f"Could not compile model {self.version}: {e}")
+            return None
+        if compiled is None:
+            print(f"Model {self.version} ({type(self.model).__name__}) can't be compiled; using sklearn")
+            return None
+
+        # Only use the compiled engine if it reproduces sklearn on probe rows
+        probe = probe_rows(self.scaler)
+        expected = self._sklearn_predict_proba(probe)
+        if not np.allclose(compiled.predict_proba(probe), expected, rtol=0, atol=1e-9):
+            print(f"Compiled model {self.version} disagrees with sklearn; using sklearn")
+            return None
+        return compiled
+
+    def _sklearn_predict_proba(self, matrix: np.ndarray) -> np.ndarray:
+        scaled_data = self.scaler.transform(pd.DataFrame(matrix, columns=FEATURES))
+        return self.model.predict_proba(scaled_data[:, :MODEL_FEATURE_COUNT])
 
     def predict(self, input_data: dict):
-        if self.scaler is None or self.model is None:
-            raise Exception("Models not loaded")
+        if self.compiled is not None:
+            labels, confidences = self.predict_many(rows_to_matrix([input_data]))
+            return labels[0], float(confidences[0])
+        ensure_finite(rows_to_matrix([input_data]))
 
         # Create DataFrame for prediction
         df = pd.DataFrame([input_data])
         
         # Ensure correct order of features
-        features = ['temperature_celsius', 'feels_like_celsius', 'humidity', 
-                    'precip_mm', 'wind_kph', 'cloud', 'risk_cluster']
-        df = df[features]
+        df = df[FEATURES]
         
         # Scale input
         scaled_data = self.scaler.transform(df)
         
         # Predict (model expects only the first 6 features)
-        model_input = scaled_data[:, :6]
+        model_input = scaled_data[:, :MODEL_FEATURE_COUNT]
         prediction = self.model.predict(model_input)[0]
         
         # Get probabilities for confidence
@@ -50,10 +119,31 @@ class ModelHandler:
         
         return prediction, confidence
 
+    def predict_many(self, rows):
+        """
+        Score N rows at once. `rows` is either an (N, 7) matrix in FEATURES
+        order or a list of feature dicts. Returns (labels, confidences) arrays.
+        """
+        matrix = rows if isinstance(rows, np.ndarray) else rows_to_matrix(rows)
+        matrix = np.atleast_2d(matrix)
+        if matrix.shape[0] == 0:
+            return np.empty(0, dtype=self.model.classes_.dtype), np.empty(0)
+        ensure_finite(matrix)
+
+        # Scale the whole batch and run one predict_proba call
+        if self.compiled is not None and matrix.shape[0] <= COMPILED_MAX_BATCH_ROWS:
+            probabilities = self.compiled.predict_proba(matrix)
+        else:
+            probabilities = self._sklearn_predict_proba(matrix)
+
+        # Labels are the argmax, as model.predict does
+        best = probabilities.argmax(axis=1)
+        labels = self.model.classes_[best]
+        confidences = probabilities[np.arange(len(best)), best]
+
+        return labels, confidences
+
     def get_feature_importance(self):
-        if self.model is None:
-            return []
-        
         features = ['Temperature', 'Feels Like', 'Humidity', 
                     'Precipitation', 'Wind Speed', 'Cloud Cover']
         
@@ -77,4 +167,167 @@ class ModelHandler:
         result.sort(key=lambda x: x["importance"], reverse=True)
         return result
 
+class PredictionCache:
+    """
+    LRU of (model version, rounded feature row) -> (label, confidence).
+    Batches larger than the cache bypass it so bulk scoring doesn't flush it.
+    """
+
+    def __init__(self, maxsize: int = PREDICTION_CACHE_SIZE, decimals: int = PREDICTION_CACHE_DECIMALS):
+        self.decimals = decimals
+        self.entries = TTLCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.invalidations = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self.entries.maxsize
+
+    def lookup(self, version: str, matrix: np.ndarray) -> Tuple[List[Any], List[Optional[Tuple[Any, float]]], List[int]]:
+        """
+        Returns (keys, cached results with None for misses, miss indices).
+        """
+        if self.maxsize <= 0 or len(matrix) > self.maxsize:
+            self.bypassed += len(matrix)
+            return [], [None] * len(matrix), list(range(len(matrix)))
+
+        rounded = np.round(matrix, self.decimals).tolist()
+        keys = [(version, *row) for row in rounded]
+        cached = [self.entries.get(key) for key in keys]
+        misses = [i for i, result in enumerate(cached) if result is None]
+        self.hits += len(keys) - len(misses)
+        self.misses += len(misses)
+        return keys, cached, misses
+
+    def store(self, keys: List[Any], cached: List[Optional[Tuple[Any, float]]], misses: List[int],
+              labels: np.ndarray, confidences: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fill the misses with freshly scored results, cache them for later
+        calls and return full label and confidence arrays in row order.
+        """
+        if not keys:
+            # Bypassed: every row was a miss and was scored in order
+            return labels, confidences
+        for i, label, confidence in zip(misses, labels, confidences):
+            cached[i] = (label, float(confidence))
+            self.entries.set(keys[i], cached[i], math.inf)
+        return np.array([label for label, _ in cached]), np.array([conf for _, conf in cached])
+
+    def clear(self):
+        self.entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": self.entries.stats()["size"],
+            "maxSize": self.maxsize,
+            "decimals": self.decimals,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.entries.evictions,
+            "invalidations": self.invalidations,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+class ModelHandler:
+    """
+    Serves predictions from the active ModelBundle. The active version is
+    loaded on first use unless `lazy=False` or `ensure_loaded()` is called
+    ahead of time (e.g. warm-up), and can be replaced at runtime with swap().
+    """
+
+    def __init__(self, lazy: bool = True):
+        self.bundle: Optional[ModelBundle] = None
+        self.load_time = None
+        self._load_attempted = False
+        self._lock = threading.Lock()
+        self.prediction_cache = PredictionCache()
+        if not lazy:
+            self.ensure_loaded()
+
+    @property
+    def loaded(self) -> bool:
+        return self.bundle is not None
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.bundle.version if self.bundle else None
+
+    @property
+    def scaler(self):
+        return self.bundle.scaler if self.bundle else None
+
+    @property
+    def model(self):
+        return self.bundle.model if self.bundle else None
+
+    def ensure_loaded(self):
+        if not self._load_attempted:
+            with self._lock:
+                if not self._load_attempted:
+                    self.load_models()
+
+    def load_models(self):
+        # Deferred import: the registry builds on the classes in this module
+        from app.utils.model_registry import load_active_bundle
+
+        start = time.perf_counter()
+        try:
+            bundle = load_active_bundle()
+            if bundle is not None:
+                self.bundle = bundle
+                self.prediction_cache.clear()
+        except Exception as e:
+            print(f"Error loading models: {e}")
+        self._load_attempted = True
+        self.load_time = time.perf_counter() - start
+
+    def swap(self, bundle: ModelBundle) -> Optional[ModelBundle]:
+        """
+        Atomically make `bundle` the active version; returns the previous one.
+        """
+        previous, self.bundle = self.bundle, bundle
+        self._load_attempted = True
+        # Keys carry the version too; clearing just frees the old entries
+        self.prediction_cache.clear()
+        return previous
+
+    def current(self) -> ModelBundle:
+        """
+        The bundle to score with. Hold on to it to keep one request on one version.
+        """
+        self.ensure_loaded()
+        bundle = self.bundle
+        if bundle is None:
+            raise Exception("Models not loaded")
+        return bundle
+
+    def predict(self, input_data: dict):
+        labels, confidences = self.predict_many(rows_to_matrix([input_data]))
+        return labels[0], float(confidences[0])
+
+    def predict_many(self, rows):
+        """
+        Like ModelBundle.predict_many, but rows seen recently are served
+        from the prediction cache instead of being re-scored.
+        """
+        bundle = self.current()
+        matrix = np.atleast_2d(rows if isinstance(rows, np.ndarray) else rows_to_matrix(rows))
+        keys, cached, misses = self.prediction_cache.lookup(bundle.version, matrix)
+        if misses:
+            labels, confidences = bundle.predict_many(matrix[misses])
+        else:
+            labels, confidences = np.empty(0), np.empty(0)
+        return self.prediction_cache.store(keys, cached, misses, labels, confidences)
+
+    def get_feature_importance(self):
+        self.ensure_loaded()
+        if self.bundle is None:
+            return []
+        return self.bundle.get_feature_importance()
+
 model_handler = ModelHandler()
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+# Each interval is stretched by a random 0..REFRESH_JITTER fraction so workers don't sync up
+REFRESH_JITTER = float(os.getenv("REFRESH_JITTER", "0.1"))
+REFRESH_MAX_RETRIES = int(os.getenv("REFRESH_MAX_RETRIES", "3"))
+REFRESH_RETRY_BACKOFF = float(os.getenv("REFRESH_RETRY_BACKOFF", "5"))
+REFRESH_RETRY_BACKOFF_MAX = float(os.getenv("REFRESH_RETRY_BACKOFF_MAX", "300"))
+
+class ScheduledJob:
+    def __init__(self, name: str, func: Callable[[], Awaitable[Any]], interval: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_status = "never"
+        self.last_error: Optional[str] = None
+        self.last_started: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_finished: Optional[float] = None
+        self.next_run: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def failed_within(self, seconds: float) -> bool:
+        """
+        Whether the last run failed less than `seconds` ago.
+        """
+        return (
+            self.last_status == "failed"
+            and self.last_finished is not None
+            and time.monotonic() - self.last_finished < seconds
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "lastStatus": self.last_status,
+            "lastError": self.last_error,
+            "lastStarted": self.last_started.isoformat() if self.last_started else None,
+            "lastDuration": round(self.last_duration, 3) if self.last_duration is not None else None,
+            "nextRun": self.next_run.isoformat() if self.next_run else None,
+        }
+
+class RefreshScheduler:
+    """
+    Runs registered refresh jobs on jittered intervals. A job never overlaps
+    with itself: periodic ticks are skipped and manual triggers join the
+    in-flight run. A job fails by raising; failed runs are retried with
+    capped exponential backoff.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._loops: Dict[str, asyncio.Task] = {}
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[Any]], interval: float) -> ScheduledJob:
+        job = ScheduledJob(name, func, interval)
+        self.jobs[name] = job
+        return job
+
+    def trigger(self, name: str, retries: Optional[int] = None) -> asyncio.Task:
+        """
+        Start a run of `name` now, or return the run already in progress.
+        `retries` overrides REFRESH_MAX_RETRIES for a run started here.
+        """
+        job = self.jobs[name]
+        if not job.running:
+            job.task = asyncio.create_task(self._run(job, REFRESH_MAX_RETRIES if retries is None else retries))
+        return job.task
+
+    async def _run(self, job: ScheduledJob, retries: int) -> bool:
+        """
+        Run `job`, retrying up to `retries` times while it raises. Returns
+        whether it succeeded.
+        """
+        job.runs += 1
+        job.last_started = datetime.utcnow()
+        job.last_status = "running"
+        start = time.perf_counter()
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    await job.func()
+                    job.last_status = "ok"
+                    job.last_error = None
+                    return True
+                except Exception as e:
+                    job.failures += 1
+                    job.last_error = str(e)
+                    if attempt == retries:
+                        job.last_status = "failed"
+                        print(f"Scheduled job {job.name} failed after {attempt + 1} attempts: {e}")
+                        return False
+                    job.last_status = "retrying"
+                    await asyncio.sleep(min(REFRESH_RETRY_BACKOFF * 2 ** attempt, REFRESH_RETRY_BACKOFF_MAX))
+        finally:
+            job.last_duration = time.perf_counter() - start
+            job.last_finished = time.monotonic()
+
+    async def _loop(self, job: ScheduledJob):
+        while True:
+            delay = job.interval * (1 + random.uniform(0, REFRESH_JITTER))
+            job.next_run = datetime.utcfromtimestamp(time.time() + delay)
+            await asyncio.sleep(delay)
+            if job.running:
+                job.skipped += 1
+                continue
+            await self.trigger(job.name)
+
+    def start(self):
+        for name, job in self.jobs.items():
+            if job.interval > 0 and name not in self._loops:
+                self._loops[name] = asyncio.create_task(self._loop(job))
+
+    async def stop(self):
+        tasks = list(self._loops.values())
+        tasks += [job.task for job in self.jobs.values() if job.running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loops.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": SCHEDULER_ENABLED,
+            "jobs": [job.status() for job in self.jobs.values()],
+        }
+
+refresh_scheduler = RefreshScheduler()
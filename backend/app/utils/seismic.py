@@ -0,0 +1,89 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+import numpy as np
+from app.utils.external_api import fetch_seismic_data
+from app.utils.zone_catalog import ZoneCatalog
+
+# Events within this distance of a zone's centre count towards it
+SEISMIC_RADIUS_KM = float(os.getenv("SEISMIC_RADIUS_KM", "300"))
+# How far back each refresh looks in the global USGS feed
+SEISMIC_WINDOW_HOURS = float(os.getenv("SEISMIC_WINDOW_HOURS", "24"))
+SEISMIC_MIN_MAGNITUDE = float(os.getenv("SEISMIC_MIN_MAGNITUDE", "2.5"))
+# Magnitude from which a nearby event is flagged as a major one
+SEISMIC_MAJOR_MAGNITUDE = float(os.getenv("SEISMIC_MAJOR_MAGNITUDE", "5.0"))
+
+def parse_events(geojson: Dict[str, Any]):
+    """
+    Pull (lat, lng, magnitude, time_ms) columns out of a USGS GeoJSON feed,
+    skipping events without coordinates or magnitude.
+    """
+    rows = []
+    for feature in geojson.get("features", []):
+        try:
+            lng, lat = feature["geometry"]["coordinates"][:2]
+            magnitude = feature["properties"]["mag"]
+            if magnitude is None:
+                continue
+            rows.append((float(lat), float(lng), float(magnitude), float(feature["properties"].get("time") or 0)))
+        except (KeyError, TypeError, ValueError):
+            continue
+    events = np.array(rows, dtype=np.float64).reshape(-1, 4)
+    return events[:, 0], events[:, 1], events[:, 2], events[:, 3]
+
+def empty_features() -> Dict[str, Any]:
+    return {"eventCount": 0, "maxMagnitude": None, "nearestKm": None, "latestEventAt": None}
+
+def summarize_by_zone(catalog: ZoneCatalog, lat: np.ndarray, lng: np.ndarray, magnitude: np.ndarray,
+                      time_ms: np.ndarray, radius_km: float = SEISMIC_RADIUS_KM) -> Dict[str, Dict[str, Any]]:
+    """
+    Join events to every zone within `radius_km` and aggregate per zone:
+    event count, max magnitude, nearest event distance and latest event time.
+    Zones without nearby events get empty_features().
+    """
+    event_index, zone_index, distance = catalog.within_radius(lat, lng, radius_km)
+    n_zones = len(catalog.zones)
+
+    counts = np.bincount(zone_index, minlength=n_zones)
+    max_magnitude = np.full(n_zones, -np.inf)
+    np.maximum.at(max_magnitude, zone_index, magnitude[event_index])
+    nearest = np.full(n_zones, np.inf)
+    np.minimum.at(nearest, zone_index, distance)
+    latest = np.zeros(n_zones)
+    np.maximum.at(latest, zone_index, time_ms[event_index])
+
+    features = {}
+    for i, zone in enumerate(catalog.zones):
+        if counts[i] == 0:
+            features[str(zone["id"])] = empty_features()
+            continue
+        features[str(zone["id"])] = {
+            "eventCount": int(counts[i]),
+            "maxMagnitude": round(float(max_magnitude[i]), 1),
+            "nearestKm": round(float(nearest[i]), 1),
+            "latestEventAt": datetime.utcfromtimestamp(latest[i] / 1000).isoformat() if latest[i] else None,
+        }
+    return features
+
+def seismic_indicators(features: Optional[Dict[str, Any]]) -> list:
+    if not features or not features.get("eventCount"):
+        return []
+    if features["maxMagnitude"] >= SEISMIC_MAJOR_MAGNITUDE:
+        return ["Major Seismic Event", "Seismic Activity"]
+    return ["Seismic Activity"]
+
+async def ingest_seismic(catalog: ZoneCatalog) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Fetch the global USGS feed for the last SEISMIC_WINDOW_HOURS once and
+    return seismic features per zone id, or None if the feed is unavailable.
+    """
+    # Minute precision keeps the cache key stable across zones and quick retries
+    end = datetime.utcnow().replace(second=0, microsecond=0)
+    start = end - timedelta(hours=SEISMIC_WINDOW_HOURS)
+    geojson = await fetch_seismic_data(start.isoformat(), end.isoformat(), SEISMIC_MIN_MAGNITUDE)
+    if "error" in geojson:
+        print(f"Error fetching seismic data: {geojson['error']}")
+        return None
+
+    lat, lng, magnitude, time_ms = parse_events(geojson)
+    return summarize_by_zone(catalog, lat, lng, magnitude, time_ms)
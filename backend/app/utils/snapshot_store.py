@@ -0,0 +1,165 @@
+import gzip
+import os
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.utils.cache import TTLCache
+from app.utils.conditional import READ_CACHE_CONTROL, etag_matches, make_etag, not_modified
+
+# Upper bound on how long a snapshot is served before it is rebuilt. Local
+# writes invalidate right away; this catches writes from other processes.
+SNAPSHOT_TTL_SECONDS = float(os.getenv("SNAPSHOT_TTL_SECONDS", "60"))
+SNAPSHOT_MAX_ENTRIES = int(os.getenv("SNAPSHOT_MAX_ENTRIES", "256"))
+# Bodies at least this large are also kept gzip-compressed (-1 disables)
+SNAPSHOT_GZIP_MIN_BYTES = int(os.getenv("SNAPSHOT_GZIP_MIN_BYTES", "1024"))
+SNAPSHOT_GZIP_LEVEL = int(os.getenv("SNAPSHOT_GZIP_LEVEL", "6"))
+
+# Headers the scratch response always carries; never copied into a snapshot
+_BUILD_HEADERS = {"content-length", "content-type"}
+
+@lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+class EncodedSnapshot:
+    """
+    A response body validated and encoded once, plus its gzip form, their
+    ETags and the headers the builder set. Serving it is a memory lookup and
+    a write; a matching If-None-Match gets a 304 without either.
+    """
+
+    __slots__ = ("body", "gzipped", "etag", "gzip_etag", "headers", "generation", "built_at")
+
+    def __init__(self, body: bytes, headers: Dict[str, str], generation: Tuple[int, int]):
+        self.body = body
+        self.gzipped = None
+        if 0 <= SNAPSHOT_GZIP_MIN_BYTES <= len(body):
+            # mtime=0 keeps the compressed bytes identical across rebuilds
+            self.gzipped = gzip.compress(body, SNAPSHOT_GZIP_LEVEL, mtime=0)
+        # Strong validators: one per encoding, both derived from the JSON body
+        self.etag = make_etag(body)
+        self.gzip_etag = make_etag(body, "-gzip") if self.gzipped is not None else None
+        self.headers = headers
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+    def age(self) -> Optional[int]:
+        """
+        The Age the builder reported, grown by the time spent in the store.
+        """
+        if "age" not in self.headers:
+            return None
+        return int(self.headers["age"]) + int(time.monotonic() - self.built_at)
+
+    def response(self, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+        merged = {**self.headers, "vary": "Accept-Encoding", "cache-control": READ_CACHE_CONTROL}
+        age = self.age()
+        if age is not None:
+            merged["age"] = str(age)
+        if headers:
+            merged.update(headers)
+        body, merged["etag"] = self.body, self.etag
+        if self.gzipped is not None and accepts_gzip(request):
+            body, merged["etag"] = self.gzipped, self.gzip_etag
+            merged["content-encoding"] = "gzip"
+        # Only the representation being served validates; the other encoding's tag is a miss
+        if etag_matches(request.headers.get("if-none-match"), [merged["etag"]]):
+            return not_modified(merged)
+        return Response(content=body, media_type="application/json", headers=merged)
+
+class SnapshotStore:
+    """
+    Pre-encoded JSON responses for read-heavy endpoints, keyed by
+    (group, name). A snapshot is rebuilt only after its group is invalidated
+    or SNAPSHOT_TTL_SECONDS pass; concurrent misses share one rebuild.
+    """
+
+    def __init__(self, ttl: float = SNAPSHOT_TTL_SECONDS, maxsize: int = SNAPSHOT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.cache = TTLCache(maxsize=maxsize)
+        # Bumped by invalidate(); a snapshot is only kept if they didn't move while it was built
+        self.epoch = 0
+        self.generations: Dict[str, int] = {}
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.invalidations = 0
+
+    def _generation(self, group: str) -> Tuple[int, int]:
+        return self.epoch, self.generations.get(group, 0)
+
+    async def get(
+        self,
+        key: Tuple[str, Hashable],
+        response_model: Any,
+        build: Callable[[Response], Awaitable[Any]],
+        cacheable: Callable[[EncodedSnapshot], bool] = lambda snapshot: True,
+    ) -> EncodedSnapshot:
+        """
+        The snapshot for `key`, building it if needed: `build` is awaited with a
+        scratch Response (for headers such as X-Next-Cursor) and its result is
+        validated and encoded through `response_model`, as FastAPI would.
+        """
+        group = key[0]
+
+        async def fetch() -> EncodedSnapshot:
+            generation = self._generation(group)
+            start = time.perf_counter()
+            scratch = Response()
+            payload = await build(scratch)
+            adapter = _adapter(response_model)
+            # pydantic-core validates and encodes in one native pass
+            body = adapter.dump_json(adapter.validate_python(payload))
+            headers = {k: v for k, v in scratch.headers.items() if k not in _BUILD_HEADERS}
+            snapshot = EncodedSnapshot(body, headers, generation)
+            self.builds += 1
+            self.build_seconds += time.perf_counter() - start
+            return snapshot
+
+        # A rebuild that raced with an invalidation is served once but not kept
+        return await self.cache.get_or_fetch(
+            key,
+            self.ttl,
+            fetch,
+            cacheable=lambda s: s.generation == self._generation(group) and cacheable(s),
+        )
+
+    async def serve(
+        self,
+        request: Request,
+        key: Tuple[str, Hashable],
+        response_model: Any,
+        build: Callable[[Response], Awaitable[Any]],
+    ) -> Response:
+        return (await self.get(key, response_model, build)).response(request)
+
+    def invalidate(self, group: Optional[str] = None):
+        """
+        Drop the snapshots of `group` (all groups if None) after a write.
+        """
+        if group is None:
+            self.epoch += 1
+            self.cache.clear()
+        else:
+            self.generations[group] = self.generations.get(group, 0) + 1
+            self.cache.delete_matching(lambda key: key[0] == group)
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.cache.stats(),
+            "ttl": self.ttl,
+            "builds": self.builds,
+            "avgBuildMs": round(self.build_seconds / self.builds * 1000, 2) if self.builds else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,61 @@
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class WarmupTracker:
+    """
+    Records the progress of startup warm-up steps (seeding, initial refresh)
+    so health endpoints can report them while they run in the background.
+    """
+
+    def __init__(self):
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        # Seconds spent in each startup phase (import, db_connect, warm-up steps)
+        self.timings: Dict[str, float] = {}
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def record(self, name: str, seconds: float):
+        self.timings[name] = round(seconds, 3)
+
+    def expect(self, *names: str):
+        """
+        Register steps up front so they show as pending before they start.
+        """
+        for name in names:
+            self.steps.setdefault(name, {"status": "pending", "duration": None, "error": None})
+
+    async def step(self, name: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.expect(name)
+        if self.started_at is None:
+            self.started_at = datetime.utcnow()
+        self.steps[name]["status"] = "running"
+        start = time.perf_counter()
+        try:
+            result = await func()
+        except Exception as e:
+            self.steps[name].update(status="failed", error=str(e))
+            raise
+        else:
+            self.steps[name]["status"] = "done"
+            return result
+        finally:
+            self.record(name, time.perf_counter() - start)
+            self.steps[name]["duration"] = self.timings[name]
+            if all(s["status"] in ("done", "failed") for s in self.steps.values()):
+                self.finished_at = datetime.utcnow()
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.steps) and all(s["status"] == "done" for s in self.steps.values())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "complete": self.complete,
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+            "steps": self.steps,
+            "timings": self.timings,
+        }
+
+warmup = WarmupTracker()
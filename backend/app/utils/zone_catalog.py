@@ -0,0 +1,166 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.db.session import db_client
+from app.utils.scheduler import refresh_scheduler
+
+# Zone metadata (id, zone, city, population, lat, lng) lives in the
+# zone_catalog collection; this interval picks up edits made there
+ZONE_CATALOG_RELOAD_INTERVAL = float(os.getenv("ZONE_CATALOG_RELOAD_INTERVAL", "300"))
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Risk zone fields mirrored into the catalog when zones are written through
+# the API; city and population are catalog-only and left as they are
+CATALOG_ZONE_FIELDS = ("id", "zone", "lat", "lng")
+
+class ZoneCatalog:
+    """
+    In-memory copy of the zone catalog with two spatial indexes: a haversine
+    BallTree for nearest/radius queries and a latitude-sorted order for
+    bounding boxes. Rebuilt as a whole on reload, so readers always see one
+    consistent version.
+    """
+
+    def __init__(self):
+        self.zones: List[Dict[str, Any]] = []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_name: Dict[str, Dict[str, Any]] = {}
+        self.lat = np.empty(0)
+        self.lng = np.empty(0)
+        self.lat_order = np.empty(0, dtype=np.intp)
+        self.sorted_lat = np.empty(0)
+        self.tree = None
+        self.loaded_at: Optional[datetime] = None
+        self.build_time = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def build(self, zones: Iterable[Dict[str, Any]]):
+        start = time.perf_counter()
+        zones = [z for z in zones if z.get("lat") is not None and z.get("lng") is not None]
+        lat = np.array([z["lat"] for z in zones], dtype=np.float64)
+        lng = np.array([z["lng"] for z in zones], dtype=np.float64)
+        lat_order = np.argsort(lat, kind="stable")
+
+        tree = None
+        if zones:
+            # Deferred import: keeps sklearn out of app start-up until the catalog loads
+            from sklearn.neighbors import BallTree
+            tree = BallTree(np.radians(np.column_stack([lat, lng])), metric="haversine")
+
+        # Swap everything in at once
+        self.zones, self.lat, self.lng, self.lat_order, self.sorted_lat, self.tree = (
+            zones, lat, lng, lat_order, lat[lat_order], tree
+        )
+        self.by_id = {str(z["id"]): z for z in zones}
+        self.by_name = {z["zone"]: z for z in zones}
+        self.loaded_at = datetime.utcnow()
+        self.build_time = time.perf_counter() - start
+
+    def get(self, zone_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(str(zone_id))
+
+    def get_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.by_name.get(name)
+
+    def nearest(self, lat: float, lng: float, k: int = 1,
+                radius_km: Optional[float] = None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Up to `k` zones closest to (lat, lng) as (zone, distance_km) pairs,
+        nearest first, optionally limited to `radius_km`.
+        """
+        if self.tree is None or k <= 0:
+            return []
+        point = np.radians([[lat, lng]])
+        distances, indices = self.tree.query(point, k=min(k, len(self.zones)))
+        results = [(self.zones[i], float(d * EARTH_RADIUS_KM)) for d, i in zip(distances[0], indices[0])]
+        if radius_km is not None:
+            results = [(zone, d) for zone, d in results if d <= radius_km]
+        return results
+
+    def within_radius(self, lats: np.ndarray, lngs: np.ndarray,
+                      radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Join points to every zone within `radius_km` of them in one query.
+        Returns flat (point_index, zone_index, distance_km) arrays, one entry per pair.
+        """
+        empty = (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), np.empty(0))
+        if self.tree is None or len(lats) == 0:
+            return empty
+        points = np.radians(np.column_stack([lats, lngs]))
+        zone_lists, distance_lists = self.tree.query_radius(
+            points, r=radius_km / EARTH_RADIUS_KM, return_distance=True
+        )
+        counts = np.fromiter((len(z) for z in zone_lists), dtype=np.intp, count=len(zone_lists))
+        if counts.sum() == 0:
+            return empty
+        point_index = np.repeat(np.arange(len(points)), counts)
+        zone_index = np.concatenate(zone_lists).astype(np.intp)
+        distances = np.concatenate(distance_lists) * EARTH_RADIUS_KM
+        return point_index, zone_index, distances
+
+    def in_bbox(self, west: float, south: float, east: float, north: float) -> List[Dict[str, Any]]:
+        """
+        Zones inside the box. west > east means the box crosses the antimeridian.
+        """
+        lo = np.searchsorted(self.sorted_lat, south, side="left")
+        hi = np.searchsorted(self.sorted_lat, north, side="right")
+        candidates = self.lat_order[lo:hi]
+        lng = self.lng[candidates]
+        if west <= east:
+            inside = (lng >= west) & (lng <= east)
+        else:
+            inside = (lng >= west) | (lng <= east)
+        return [self.zones[i] for i in np.sort(candidates[inside])]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "zones": len(self.zones),
+            "loadedAt": self.loaded_at.isoformat() if self.loaded_at else None,
+            "buildSeconds": round(self.build_time, 4),
+        }
+
+zone_catalog = ZoneCatalog()
+# One reload at a time, so an older read can't be built after a newer one
+_reload_lock = asyncio.Lock()
+
+async def load_zone_catalog(db=None) -> ZoneCatalog:
+    """
+    (Re)build the in-memory catalog from the zone_catalog collection.
+    """
+    db = db if db is not None else db_client.db
+    if db is None:
+        return zone_catalog
+    async with _reload_lock:
+        docs = await db.zone_catalog.find({}, {"_id": 0}).to_list(length=None)
+        zone_catalog.build(docs)
+    return zone_catalog
+
+async def upsert_catalog_zone(db, zone_id: str, zone: Dict[str, Any]) -> ZoneCatalog:
+    """
+    Mirror a risk zone created or updated through the API into the catalog
+    and rebuild the index, so near/bbox queries see the change right away.
+    """
+    await db.zone_catalog.update_one(
+        {"id": zone_id},
+        {"$set": {field: zone.get(field) for field in CATALOG_ZONE_FIELDS}},
+        upsert=True,
+    )
+    return await load_zone_catalog(db)
+
+async def delete_catalog_zone(db, zone_id: str) -> ZoneCatalog:
+    await db.zone_catalog.delete_one({"id": zone_id})
+    return await load_zone_catalog(db)
+
+async def ensure_zone_catalog() -> ZoneCatalog:
+    if not zone_catalog.loaded:
+        await load_zone_catalog()
+    return zone_catalog
+
+refresh_scheduler.add_job("zone_catalog", load_zone_catalog, ZONE_CATALOG_RELOAD_INTERVAL)
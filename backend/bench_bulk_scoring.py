@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import json
+import resource
+import time
+from bench_prediction import load_handler, make_rows
+from app.utils.prediction import FEATURES, model_handler
+from app.utils.bulk_scoring import STREAM_BLOCK_ROWS, score_stream
+
+CHUNK_ROWS = 500
+POOL_CHUNKS = 20
+
+def encode_chunks(fmt: str):
+    """
+    A fixed pool of pre-encoded upload chunks, cycled to build uploads of any
+    size without holding (or spending time generating) the whole body.
+    """
+    chunks = []
+    for i in range(POOL_CHUNKS):
+        rows = make_rows(CHUNK_ROWS, seed=i).tolist()
+        if fmt == "csv":
+            chunks.append("".join(",".join(map(repr, row)) + "\n" for row in rows).encode())
+        else:
+            chunks.append("".join(json.dumps(dict(zip(FEATURES, row))) + "\n" for row in rows).encode())
+    return chunks
+
+async def upload(chunks, fmt: str, n_rows: int):
+    if fmt == "csv":
+        yield (",".join(FEATURES) + "\n").encode()
+    for i in range(n_rows // CHUNK_ROWS):
+        yield chunks[i % len(chunks)]
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def bench(fmt: str, sizes, block_rows: int):
+    chunks = encode_chunks(fmt)
+    # Warm up the executor and allocator so the baseline isn't a cold start
+    async for _ in score_stream(upload(chunks, fmt, 10 * CHUNK_ROWS), fmt, block_rows):
+        pass
+    baseline = peak_rss_mb()
+    print(f"{fmt}: block={block_rows} rows, baseline peak RSS {baseline:.1f} MB")
+
+    for n_rows in sizes:
+        out_bytes = 0
+        start = time.perf_counter()
+        async for piece in score_stream(upload(chunks, fmt, n_rows), fmt, block_rows):
+            out_bytes += len(piece)
+        elapsed = time.perf_counter() - start
+        print(f"  {n_rows:>10,} rows  {n_rows / elapsed:>10,.0f} rows/sec  "
+              f"{out_bytes / 2**20:>8.1f} MB out  peak RSS {peak_rss_mb():.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and peak memory of streaming bulk scoring")
+    parser.add_argument("--rows", type=int, nargs="+", default=[50_000, 200_000, 800_000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], nargs="+", default=["ndjson", "csv"])
+    parser.add_argument("--block-rows", type=int, default=STREAM_BLOCK_ROWS)
+    args = parser.parse_args()
+
+    model_handler.swap(load_handler().bundle)
+    for fmt in args.format:
+        asyncio.run(bench(fmt, args.rows, args.block_rows))
+
+if __name__ == "__main__":
+    main()
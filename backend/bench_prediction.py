@@ -0,0 +1,114 @@
+import argparse
+import time
+import numpy as np
+from app.utils.prediction import ModelHandler, ModelBundle, PredictionCache, FEATURES, MODEL_FEATURE_COUNT
+
+def make_rows(n: int, seed: int = 0) -> np.ndarray:
+    """
+    Random but plausible weather feature rows in FEATURES order.
+    """
+    rng = np.random.default_rng(seed)
+    temp = rng.normal(22, 9, n)
+    return np.column_stack([
+        temp,
+        temp + rng.normal(1, 2, n),
+        rng.uniform(10, 100, n),
+        rng.exponential(0.2, n),
+        rng.uniform(0, 60, n),
+        rng.uniform(0, 100, n),
+        rng.integers(0, 3, n),
+    ])
+
+def load_handler() -> ModelHandler:
+    handler = ModelHandler(lazy=False)
+    # Every benchmark re-scores the same rows; measure the model, not the cache
+    handler.prediction_cache = PredictionCache(maxsize=0)
+    if handler.scaler is not None and handler.model is not None:
+        return handler
+
+    # No artifacts on disk: fit a stand-in tree ensemble so the benchmark still runs
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    import pandas as pd
+
+    print("Using a synthetic RandomForest model (pronezone_model.pkl not found)")
+    X = pd.DataFrame(make_rows(5000, seed=1), columns=FEATURES)
+    y = np.digitize(X["wind_kph"] + X["precip_mm"] * 20, [15, 30, 45])
+    scaler = StandardScaler().fit(X)
+    scaled = scaler.transform(X)[:, :MODEL_FEATURE_COUNT]
+    model = RandomForestClassifier(n_estimators=100, random_state=0).fit(scaled, y)
+    handler.swap(ModelBundle("synthetic", scaler, model))
+    return handler
+
+def bench_single(handler: ModelHandler, matrix: np.ndarray) -> float:
+    rows = [dict(zip(FEATURES, row)) for row in matrix]
+    start = time.perf_counter()
+    for row in rows:
+        handler.predict(row)
+    return len(rows) / (time.perf_counter() - start)
+
+def bench_batch(handler: ModelHandler, matrix: np.ndarray, batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(matrix), batch_size):
+        handler.predict_many(matrix[i:i + batch_size])
+    return len(matrix) / (time.perf_counter() - start)
+
+def time_call(func, min_seconds: float = 0.3) -> float:
+    """
+    Mean seconds per call of `func`, repeated for at least `min_seconds`.
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+def bench_backends(handler: ModelHandler, matrix: np.ndarray, batch_sizes):
+    sklearn_bundle = ModelBundle("sklearn", handler.scaler, handler.model, backend="sklearn")
+    compiled_bundle = ModelBundle("compiled", handler.scaler, handler.model, backend="compiled")
+    engine = compiled_bundle.compiled
+    if engine is None:
+        print(f"{type(handler.model).__name__} can't be compiled; skipping backend comparison")
+        return
+
+    expected = sklearn_bundle._sklearn_predict_proba(matrix)
+    actual = engine.predict_proba(matrix)
+    print(f"compiled vs sklearn: max |proba diff| = {np.abs(actual - expected).max():.2e}, "
+          f"label mismatches = {int((actual.argmax(1) != expected.argmax(1)).sum())}")
+
+    row = dict(zip(FEATURES, matrix[0]))
+    print(f"{'single-row predict':<28} sklearn {time_call(lambda: sklearn_bundle.predict(row)) * 1e3:>9.3f} ms"
+          f"   compiled {time_call(lambda: compiled_bundle.predict(row)) * 1e3:>9.3f} ms")
+    for batch_size in batch_sizes:
+        batch = matrix[:batch_size]
+        sk = time_call(lambda: sklearn_bundle._sklearn_predict_proba(batch))
+        cp = time_call(lambda: engine.predict_proba(batch))
+        label = f"batch predict_proba ({len(batch)})"
+        print(f"{label:<28} sklearn {sk * 1e3:>9.3f} ms   compiled {cp * 1e3:>9.3f} ms  ({sk / cp:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-row and batch prediction throughput")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256, 2000])
+    parser.add_argument("--backends", action="store_true", help="also compare the sklearn and compiled engines")
+    args = parser.parse_args()
+
+    handler = load_handler()
+    matrix = make_rows(args.rows)
+
+    if args.backends:
+        bench_backends(handler, matrix, args.batch_sizes)
+        print()
+
+    single = bench_single(handler, matrix)
+    print(f"{'predict (single-row)':<28} {single:>12,.0f} rows/sec")
+    for batch_size in args.batch_sizes:
+        rate = bench_batch(handler, matrix, batch_size)
+        label = f"predict_many (batch={batch_size})"
+        print(f"{label:<28} {rate:>12,.0f} rows/sec  ({rate / single:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import sys
+from app.db.session import db_client, connect_to_mongo, close_mongo_connection
+from app.db.indexes import ensure_indexes, check_query_plans, QUERY_PLANS
+
+async def run(create_indexes: bool) -> int:
+    await connect_to_mongo()
+    try:
+        db = db_client.db
+        if create_indexes:
+            await ensure_indexes(db)
+        scans = await check_query_plans(db)
+        for scan in scans:
+            query = f"{scan['collection']}.find({scan['filter']})"
+            if scan["sort"]:
+                query += f".sort({scan['sort']})"
+            print(f"COLLSCAN: {query} -> {' > '.join(scan['stages'])}")
+        print(f"{len(QUERY_PLANS) - len(scans)}/{len(QUERY_PLANS)} queries use an index")
+        return 1 if scans else 0
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="explain() every API query against MONGODB_URL and fail if any does a COLLSCAN"
+    )
+    parser.add_argument("--no-create", action="store_true",
+                        help="check the database as it is instead of applying the index spec first")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(not args.no_create)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import time
+import numpy as np
+from bench_prediction import load_handler, make_rows
+from app.utils.prediction import FEATURES, PredictionCache, model_handler
+from app.utils.inference_executor import inference_executor
+from app.utils.micro_batcher import prediction_batcher
+
+def summarize(label: str, latencies, elapsed: float, errors: int):
+    ms = np.array(latencies) * 1000
+    print(f"{label:<22} {len(ms) / elapsed:>9,.0f} req/s   "
+          f"p50 {np.percentile(ms, 50):>7.2f} ms   p95 {np.percentile(ms, 95):>7.2f} ms   "
+          f"p99 {np.percentile(ms, 99):>7.2f} ms   errors {errors}")
+
+async def run_load(send, payloads, concurrency: int):
+    """
+    `concurrency` clients send the payloads back to back; returns
+    (latencies, elapsed seconds, error count).
+    """
+    queue = iter(payloads)
+    latencies, errors = [], 0
+
+    async def client():
+        nonlocal errors
+        for payload in queue:
+            start = time.perf_counter()
+            try:
+                await send(payload)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start, errors
+
+async def in_process(payloads, concurrency: int):
+    """
+    Call the /predict handler directly, with and without coalescing.
+    """
+    from app.api.v1.endpoints.prediction import predict_risk
+    from app.schemas.prediction import PredictionInput
+
+    model_handler.swap(load_handler().bundle)
+    # Both runs replay the same payloads, which would otherwise be cache hits
+    model_handler.prediction_cache = PredictionCache(maxsize=0)
+    await inference_executor.warm_up()
+    inputs = [PredictionInput(**p) for p in payloads]
+    batch_size = prediction_batcher.max_size
+
+    for label, max_size in [("unbatched", 1), (f"batched (<= {batch_size})", batch_size)]:
+        prediction_batcher.max_size = max_size
+        await run_load(predict_risk, inputs[:200], concurrency)  # warm the pool
+        latencies, elapsed, errors = await run_load(predict_risk, inputs, concurrency)
+        summarize(label, latencies, elapsed, errors)
+    print(f"batcher: {prediction_batcher.stats()}")
+    inference_executor.shutdown()
+
+async def over_http(payloads, concurrency: int, url: str):
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        async def send(payload):
+            response = await client.post("/api/v1/predict/", json=payload)
+            response.raise_for_status()
+
+        latencies, elapsed, errors = await run_load(send, payloads, concurrency)
+        summarize("http", latencies, elapsed, errors)
+        print(f"batcher: {(await client.get('/api/v1/system/micro-batcher')).json()}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test POST /predict with concurrent clients")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--url", help="target a running server (e.g. http://127.0.0.1:8001) instead of "
+                                      "comparing batched and unbatched scoring in-process")
+    args = parser.parse_args()
+
+    payloads = [dict(zip(FEATURES, map(float, row))) for row in make_rows(args.requests)]
+    if args.url:
+        asyncio.run(over_http(payloads, args.concurrency, args.url))
+    else:
+        asyncio.run(in_process(payloads, args.concurrency))
+
+if __name__ == "__main__":
+    main()
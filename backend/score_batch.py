@@ -0,0 +1,124 @@
+import argparse
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from app.utils.prediction import FEATURES
+from app.utils.inference_executor import init_model_worker, score_in_worker
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet files need pyarrow: pip install pyarrow")
+    return pyarrow
+
+def read_chunks(path: Path, chunk_rows: int, columns):
+    """
+    Yield DataFrames of at most `chunk_rows` rows from a CSV or Parquet file.
+    """
+    if path.suffix.lower() == ".parquet":
+        pyarrow = _require_pyarrow()
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        present = [c for c in columns if c in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=present):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=lambda c: c in columns)
+
+def to_matrix(chunk: pd.DataFrame) -> np.ndarray:
+    # risk_cluster isn't used by the model itself, so archives may omit it
+    if "risk_cluster" not in chunk.columns:
+        chunk = chunk.assign(risk_cluster=0)
+    missing = [f for f in FEATURES if f not in chunk.columns]
+    if missing:
+        raise SystemExit(f"Input is missing feature columns: {', '.join(missing)}")
+    return chunk[FEATURES].to_numpy(dtype=np.float64)
+
+class ChunkWriter:
+    """
+    Appends scored chunks to a CSV or Parquet output file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.parquet = path.suffix.lower() == ".parquet"
+        self.writer = None
+        self.rows = 0
+
+    def write(self, frame: pd.DataFrame):
+        if self.parquet:
+            pyarrow = _require_pyarrow()
+            table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            if self.writer is None:
+                self.writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def score_file(input_path: Path, output_path: Path, workers: int, chunk_rows: int,
+               keep_columns, version=None):
+    """
+    Shard the input's chunks over `workers` processes, each with its own
+    loaded model, and write results in input order as they complete.
+    At most two chunks per worker are held in memory at a time.
+    """
+    writer = ChunkWriter(output_path)
+    versions = set()
+    pending = deque()
+    start = time.perf_counter()
+
+    def write_next():
+        kept, future = pending.popleft()
+        labels, confidences, scored_version = future.result()
+        versions.add(scored_version)
+        kept["risk_level"] = labels
+        kept["confidence"] = confidences
+        writer.write(kept)
+        elapsed = time.perf_counter() - start
+        print(f"{writer.rows:,} rows scored ({writer.rows / elapsed:,.0f} rows/sec)")
+
+    # spawn so workers don't inherit anything but what the initializer loads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_model_worker) as pool:
+        try:
+            for chunk in read_chunks(input_path, chunk_rows, set(FEATURES) | set(keep_columns)):
+                kept = chunk[[c for c in keep_columns if c in chunk.columns]].reset_index(drop=True)
+                pending.append((kept, pool.submit(score_in_worker, to_matrix(chunk), version)))
+                if len(pending) >= 2 * workers:
+                    write_next()
+            while pending:
+                write_next()
+        finally:
+            writer.close()
+
+    print(f"Wrote {writer.rows:,} predictions to {output_path} with model "
+          f"{', '.join(sorted(v for v in versions if v)) or 'n/a'} in {time.perf_counter() - start:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet feature file offline")
+    parser.add_argument("input", type=Path, help="CSV or .parquet file with the model's feature columns")
+    parser.add_argument("output", type=Path, help="CSV or .parquet file to write predictions to")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--keep", nargs="*", default=[], metavar="COLUMN",
+                        help="input columns (e.g. ids, timestamps) to copy to the output")
+    parser.add_argument("--model-version", help="registry version to score with (default: the active one)")
+    args = parser.parse_args()
+
+    score_file(args.input, args.output, max(args.workers, 1), args.chunk_rows, args.keep, args.model_version)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 import asyncio
 from app.db.init_db import init_db
 from app.db.session import connect_to_mongo, close_mongo_connection
+from app.utils.http_client import open_http_client, close_http_client
 
 async def main():
     print("Starting database seeding...")
     await connect_to_mongo()
+    await open_http_client()
     await init_db()
+    await close_http_client()
     await close_mongo_connection()
     print("Seeding complete!")
 
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from app.utils import bulk_scoring
+from app.utils.bulk_scoring import BlockParser, BulkFormatError
+from app.utils.prediction import FEATURES
+
+def record(value):
+    return {f: value for f in FEATURES}
+
+def ndjson(*records):
+    return b"".join(json.dumps(r).encode() + b"\n" for r in records)
+
+def parse(parser, data):
+    blocks = list(parser.feed(data))
+    return blocks + list(parser.close())
+
+def test_ndjson_blocks_keep_row_order():
+    parser = BlockParser("ndjson", block_rows=2)
+    blocks = parse(parser, ndjson(*(record(i) for i in range(5))))
+
+    assert [len(b) for b in blocks] == [2, 2, 1]
+    np.testing.assert_array_equal(np.vstack(blocks)[:, 0], [0, 1, 2, 3, 4])
+
+def test_two_objects_on_one_line_are_rejected_at_that_row():
+    parser = BlockParser("ndjson", block_rows=10)
+    data = ndjson(record(0), record(1)) + json.dumps(record(2)).encode() + b"," + ndjson(record(3), record(4))
+    blocks = []
+
+    with pytest.raises(BulkFormatError, match="row 2"):
+        for block in parser.feed(data):
+            blocks.append(block)
+        for block in parser.close():
+            blocks.append(block)
+
+    # The rows before the bad line were still handed out, in order
+    assert len(blocks) == 1
+    np.testing.assert_array_equal(blocks[0][:, 0], [0, 1])
+
+def test_missing_feature_is_rejected_at_that_row():
+    parser = BlockParser("ndjson", block_rows=10)
+    bad = record(1)
+    del bad["humidity"]
+
+    with pytest.raises(BulkFormatError, match="row 1"):
+        parse(parser, ndjson(record(0), bad, record(2)))
+
+def test_csv_uses_header_order():
+    parser = BlockParser("csv", block_rows=10)
+    header = ",".join(reversed(FEATURES)).encode() + b"\n"
+    row = ",".join(str(i) for i in range(len(FEATURES))).encode() + b"\n"
+
+    (block,) = parse(parser, header + row)
+
+    np.testing.assert_array_equal(block[0], list(reversed(range(len(FEATURES)))))
+
+class FakeExecutor:
+    async def predict_many(self, matrix, bounded=True, use_cache=True):
+        return matrix[:, 0].astype(int), np.full(len(matrix), 0.5), "test"
+
+def test_stream_scores_rows_up_to_the_bad_line(monkeypatch):
+    monkeypatch.setattr(bulk_scoring, "inference_executor", FakeExecutor())
+    data = ndjson(record(0), record(1)) + b"{},{}\n" + ndjson(record(3))
+
+    async def chunks():
+        yield data
+
+    async def scenario():
+        return [chunk async for chunk in bulk_scoring.score_stream(chunks(), "ndjson", block_rows=10)]
+
+    lines = b"".join(asyncio.run(scenario())).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+
+    assert [r["row"] for r in records[:2]] == [0, 1]
+    assert [r["risk_level"] for r in records[:2]] == ["0", "1"]
+    assert records[2]["row"] == 2 and "row 2" in records[2]["error"]
+    assert len(records) == 3
+
+@pytest.mark.parametrize("value", [None, "3.5", True, float("nan"), float("inf")])
+def test_non_numeric_feature_is_rejected_at_that_row(value):
+    parser = BlockParser("ndjson", block_rows=10)
+    bad = record(1)
+    bad["humidity"] = value
+
+    with pytest.raises(BulkFormatError, match="row 1: 'humidity' must be a finite number"):
+        parse(parser, ndjson(record(0), bad, record(2)))
+
+def test_non_finite_csv_value_is_rejected_at_that_row():
+    parser = BlockParser("csv", block_rows=10)
+    header = ",".join(FEATURES).encode() + b"\n"
+    rows = [",".join(["1"] * len(FEATURES)) for _ in range(3)]
+    rows[2] = rows[2].replace("1", "nan", 1)
+
+    with pytest.raises(BulkFormatError, match="row 2"):
+        parse(parser, header + "\n".join(rows).encode() + b"\n")
+
+class FailingExecutor:
+    async def predict_many(self, matrix, bounded=True, use_cache=True):
+        raise RuntimeError("Models not loaded")
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_scoring_failure_ends_the_stream_with_an_error_line(monkeypatch, fmt):
+    monkeypatch.setattr(bulk_scoring, "inference_executor", FailingExecutor())
+    if fmt == "csv":
+        data = ",".join(FEATURES).encode() + b"\n" + ",".join(["1"] * len(FEATURES)).encode() + b"\n"
+    else:
+        data = ndjson(record(0))
+
+    async def chunks():
+        yield data
+
+    async def scenario():
+        return [chunk async for chunk in bulk_scoring.score_stream(chunks(), fmt, block_rows=10)]
+
+    last = b"".join(asyncio.run(scenario())).decode().splitlines()[-1]
+    if fmt == "csv":
+        assert last == "# error: Scoring failed on row 0: Models not loaded"
+    else:
+        assert json.loads(last) == {"error": "Scoring failed on row 0: Models not loaded", "row": 0}
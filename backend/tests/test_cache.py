@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from app.utils.cache import TTLCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=4, clock=clock)
+    cache.set("a", 1, ttl=10)
+
+    clock.advance(9.9)
+    assert cache.get("a") == 1
+    clock.advance(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+def test_non_positive_ttl_is_not_stored(clock):
+    cache = TTLCache(maxsize=4, clock=clock)
+    cache.set("a", 1, ttl=0)
+    assert cache.get("a") is None
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(maxsize=2, clock=clock)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+    cache.set("c", 3, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_get_or_fetch_caches_until_expiry(clock):
+    cache = TTLCache(maxsize=4, clock=clock)
+    calls = []
+
+    async def fetch():
+        calls.append(clock())
+        return len(calls)
+
+    async def scenario():
+        assert await cache.get_or_fetch("k", 5, fetch) == 1
+        assert await cache.get_or_fetch("k", 5, fetch) == 1
+        clock.advance(5)
+        assert await cache.get_or_fetch("k", 5, fetch) == 2
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert cache.hits == 1 and cache.misses == 2
+
+def test_uncacheable_results_are_not_stored(clock):
+    cache = TTLCache(maxsize=4, clock=clock)
+
+    async def fetch():
+        return {"stale": True}
+
+    async def scenario():
+        await cache.get_or_fetch("k", 60, fetch, cacheable=lambda value: not value["stale"])
+
+    asyncio.run(scenario())
+    assert cache.get("k") is None
+
+def test_concurrent_misses_share_one_fetch(clock):
+    cache = TTLCache(maxsize=4, clock=clock)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_fetch("k", 60, fetch) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["value"] * 10
+    assert calls == 1
+    assert cache.misses == 1 and cache.coalesced == 9
+
+def test_fetch_errors_reach_every_waiter(clock):
+    cache = TTLCache(maxsize=4, clock=clock)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_fetch("k", 60, fetch) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.get("k") is None
+
+def test_cancelled_leader_does_not_cancel_waiters(clock):
+    cache = TTLCache(maxsize=4, clock=clock)
+    started = 0
+
+    async def fetch():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.05)
+        return f"value-{started}"
+
+    async def scenario():
+        leader = asyncio.create_task(cache.get_or_fetch("k", 60, fetch))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_fetch("k", 60, fetch)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    results = asyncio.run(scenario())
+    # The waiters fall back to one new fetch between them
+    assert results == ["value-2"] * 3
+    assert started == 2
+    assert cache.get("k") == "value-2"
+
+def test_cancelled_waiter_does_not_cancel_leader(clock):
+    cache = TTLCache(maxsize=4, clock=clock)
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def scenario():
+        leader = asyncio.create_task(cache.get_or_fetch("k", 60, fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_fetch("k", 60, fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(scenario()) == "value"
+    assert cache.get("k") == "value"
@@ -0,0 +1,128 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier, ExtraTreeClassifier
+
+from app.utils.compiled_model import COMPILED_BLOCK_ROWS, compile_model
+from app.utils.prediction import COMPILED_MAX_BATCH_ROWS, FEATURES, MODEL_FEATURE_COUNT, ModelBundle
+
+def make_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    temp = rng.normal(22, 9, n)
+    return np.column_stack([
+        temp,
+        temp + rng.normal(1, 2, n),
+        rng.uniform(10, 100, n),
+        rng.exponential(0.2, n),
+        rng.uniform(0, 60, n),
+        rng.uniform(0, 100, n),
+        rng.integers(0, 3, n),
+    ])
+
+def frame(matrix):
+    return pd.DataFrame(np.atleast_2d(matrix), columns=FEATURES)
+
+def fit(estimator, n=2000, seed=0):
+    # Fitted on named columns, like the production scaler
+    rows = frame(make_rows(n, seed))
+    scaler = StandardScaler().fit(rows)
+    X = scaler.transform(rows)[:, :MODEL_FEATURE_COUNT]
+    # Four uneven classes from a noisy non-linear rule
+    score = X[:, 0] * 0.8 + X[:, 2] * 0.6 - X[:, 4] * 0.9 + np.random.default_rng(seed).normal(0, 0.5, n)
+    y = np.digitize(score, [-1.0, 0.3, 1.2])
+    return scaler, estimator.fit(X, y)
+
+def sklearn_proba(scaler, model, matrix):
+    return model.predict_proba(scaler.transform(frame(matrix))[:, :MODEL_FEATURE_COUNT])
+
+ESTIMATORS = {
+    "random_forest": lambda: RandomForestClassifier(n_estimators=25, random_state=0),
+    "random_forest_depth_limited": lambda: RandomForestClassifier(n_estimators=25, max_depth=4, random_state=0),
+    "extra_trees": lambda: ExtraTreesClassifier(n_estimators=25, random_state=0),
+    "extra_trees_depth_limited": lambda: ExtraTreesClassifier(n_estimators=25, max_depth=3, random_state=0),
+    "decision_tree": lambda: DecisionTreeClassifier(random_state=0),
+    "decision_tree_depth_limited": lambda: DecisionTreeClassifier(max_depth=2, random_state=0),
+    "extra_tree": lambda: ExtraTreeClassifier(random_state=0),
+}
+
+@pytest.fixture(params=sorted(ESTIMATORS), scope="module")
+def fitted(request):
+    return fit(ESTIMATORS[request.param]())
+
+@pytest.mark.parametrize("n_rows", [1, 7, COMPILED_MAX_BATCH_ROWS + 1, COMPILED_BLOCK_ROWS + 100])
+def test_predict_proba_matches_sklearn(fitted, n_rows):
+    scaler, model = fitted
+    compiled = compile_model(scaler, model, MODEL_FEATURE_COUNT)
+    matrix = make_rows(n_rows, seed=1)
+
+    expected = sklearn_proba(scaler, model, matrix)
+    actual = compiled.predict_proba(matrix)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9)
+    np.testing.assert_array_equal(model.classes_[actual.argmax(axis=1)], model.predict(
+        scaler.transform(frame(matrix))[:, :MODEL_FEATURE_COUNT]))
+
+def test_single_row_vector(fitted):
+    scaler, model = fitted
+    compiled = compile_model(scaler, model, MODEL_FEATURE_COUNT)
+    row = make_rows(1, seed=2)[0]
+
+    np.testing.assert_allclose(compiled.predict_proba(row), sklearn_proba(scaler, model, row[None, :]),
+                               rtol=0, atol=1e-9)
+
+@pytest.mark.parametrize("n_rows", [1, 64, COMPILED_MAX_BATCH_ROWS, COMPILED_MAX_BATCH_ROWS + 1])
+def test_bundle_labels_and_confidences_match_sklearn_backend(fitted, n_rows):
+    scaler, model = fitted
+    compiled = ModelBundle("test", scaler, model, backend="compiled")
+    reference = ModelBundle("test", scaler, model, backend="sklearn")
+    assert compiled.backend == "compiled"
+
+    matrix = make_rows(n_rows, seed=3)
+    labels, confidences = compiled.predict_many(matrix)
+    expected_labels, expected_confidences = reference.predict_many(matrix)
+
+    np.testing.assert_array_equal(labels, expected_labels)
+    np.testing.assert_allclose(confidences, expected_confidences, rtol=0, atol=1e-9)
+
+def test_single_prediction_matches_sklearn_backend(fitted):
+    scaler, model = fitted
+    row = dict(zip(FEATURES, make_rows(1, seed=4)[0]))
+
+    label, confidence = ModelBundle("test", scaler, model, backend="compiled").predict(row)
+    expected_label, expected_confidence = ModelBundle("test", scaler, model, backend="sklearn").predict(row)
+
+    assert label == expected_label
+    assert confidence == pytest.approx(expected_confidence, abs=1e-9)
+
+def test_unsupported_estimator_falls_back_to_sklearn():
+    scaler, model = fit(LogisticRegression(max_iter=500))
+
+    assert compile_model(scaler, model, MODEL_FEATURE_COUNT) is None
+    assert ModelBundle("test", scaler, model, backend="compiled").backend == "sklearn"
+
+@pytest.mark.parametrize("value", [np.nan, np.inf, -np.inf])
+@pytest.mark.parametrize("backend", ["compiled", "sklearn"])
+def test_non_finite_features_are_rejected(fitted, backend, value):
+    scaler, model = fitted
+    bundle = ModelBundle("test", scaler, model, backend=backend)
+    matrix = make_rows(5, seed=5)
+    matrix[3, 2] = value
+
+    with pytest.raises(ValueError, match="Non-finite feature value in row 3"):
+        bundle.predict_many(matrix)
+    with pytest.raises(ValueError, match="Non-finite feature value"):
+        bundle.predict(dict(zip(FEATURES, matrix[3])))
+
+@pytest.mark.parametrize("value", ["NaN", "Infinity", "-Infinity"])
+def test_prediction_input_rejects_non_finite_values(value):
+    from pydantic import ValidationError
+    from app.schemas.prediction import PredictionInput
+
+    payload = dict(zip(FEATURES, [20.0, 21.0, 50.0, 0.0, 10.0, 30.0, 1]), humidity=value)
+    with pytest.raises(ValidationError):
+        PredictionInput.model_validate_json(json.dumps(payload))
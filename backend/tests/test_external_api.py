@@ -0,0 +1,150 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.utils import external_api
+from app.utils.http_client import close_http_client, open_http_client
+from app.utils.zone_catalog import ZoneCatalog
+
+ZONES = [
+    {"id": "1", "zone": "Harbor Front", "city": "Mumbai", "lat": 19.07, "lng": 72.87},
+    {"id": "2", "zone": "Old Town", "city": "Delhi", "lat": 28.61, "lng": 77.21},
+]
+
+def weather_payload(city, wind=3.0, rain=False):
+    return {
+        "name": city,
+        "main": {"temp": 28.0, "humidity": 70},
+        "wind": {"speed": wind},
+        "weather": [{"main": "Rain" if rain else "Clear"}],
+    }
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    catalog = ZoneCatalog()
+    catalog.build(ZONES)
+
+    async def ensure_zone_catalog():
+        return catalog
+
+    monkeypatch.setattr(external_api, "OPENWEATHER_API_KEY", "test-key")
+    monkeypatch.setattr(external_api, "ensure_zone_catalog", ensure_zone_catalog)
+    external_api.api_cache.clear()
+    yield
+    external_api.api_cache.clear()
+
+@pytest.fixture
+def transport():
+    """
+    Install a shared client backed by an httpx.MockTransport; call the
+    fixture with the request handler.
+    """
+    def install(handler):
+        asyncio.run(open_http_client(transport=httpx.MockTransport(handler)))
+
+    yield install
+    asyncio.run(close_http_client())
+
+def test_fetch_many_respects_concurrency_limit(transport):
+    cities = [f"City {i}" for i in range(12)]
+    active = peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200, json=weather_payload(request.url.params["q"]))
+
+    transport(handler)
+    results = asyncio.run(external_api.fetch_many(external_api.fetch_weather_data, cities, concurrency=3, timeout=5))
+
+    assert peak == 3
+    assert list(results) == cities
+    assert all(results[city]["name"] == city for city in cities)
+
+def test_fetch_many_deduplicates_keys(transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.params["q"])
+        return httpx.Response(200, json=weather_payload(request.url.params["q"]))
+
+    transport(handler)
+    results = asyncio.run(external_api.fetch_many(external_api.fetch_weather_data, ["Pune", "Pune", "Goa"]))
+
+    assert list(results) == ["Pune", "Goa"]
+    assert sorted(requests) == ["Goa", "Pune"]
+
+def test_timeout_on_one_source_does_not_sink_the_others(transport):
+    async def handler(request):
+        city = request.url.params["q"]
+        if city == "Slow":
+            await asyncio.sleep(5)
+        return httpx.Response(200, json=weather_payload(city))
+
+    transport(handler)
+    results = asyncio.run(external_api.fetch_many(
+        external_api.fetch_weather_data, ["Fast", "Slow", "Quick"], concurrency=3, timeout=0.1
+    ))
+
+    assert results["Slow"] == {"error": "Request timed out after 0.1s"}
+    assert results["Fast"]["name"] == "Fast"
+    assert results["Quick"]["name"] == "Quick"
+    # The timed-out source isn't cached, so the next refresh tries it again
+    assert external_api.api_cache.get(("weather", "slow")) is None
+
+def test_upstream_errors_come_back_as_payloads(transport):
+    def handler(request):
+        city = request.url.params["q"]
+        if city == "Broken":
+            return httpx.Response(503)
+        return httpx.Response(200, json=weather_payload(city))
+
+    transport(handler)
+    results = asyncio.run(external_api.fetch_many(external_api.fetch_weather_data, ["Broken", "Fine"]))
+
+    assert results["Broken"] == {"error": "HTTP error occurred: 503"}
+    assert results["Fine"]["name"] == "Fine"
+
+def test_real_time_indicators_reuse_fetched_weather(transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url)
+        return httpx.Response(200, json=weather_payload("Mumbai"))
+
+    transport(handler)
+    weather = weather_payload("Mumbai", wind=14.0, rain=True)
+    indicators = asyncio.run(external_api.get_real_time_indicators("Harbor Front", weather=weather))
+
+    assert indicators == ["High Wind Speed", "Heavy Rainfall"]
+    assert requests == []
+
+def test_real_time_indicators_fetch_weather_when_not_given(transport):
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.params["q"])
+        return httpx.Response(200, json=weather_payload("Delhi", wind=12.0))
+
+    async def scenario():
+        first = await external_api.get_real_time_indicators("Old Town")
+        # The second call is served from the response cache
+        second = await external_api.get_real_time_indicators("Old Town")
+        return first, second
+
+    transport(handler)
+    first, second = asyncio.run(scenario())
+
+    assert first == second == ["High Wind Speed"]
+    assert requests == ["Delhi"]
+
+def test_real_time_indicators_for_unknown_zone(transport):
+    def handler(request):
+        raise AssertionError("no request expected")
+
+    transport(handler)
+    assert asyncio.run(external_api.get_real_time_indicators("Nowhere")) == ["Normal Conditions"]
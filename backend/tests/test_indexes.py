@@ -0,0 +1,79 @@
+import asyncio
+
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from app.db.indexes import INDEX_SPEC, QUERY_PLANS, ensure_indexes
+
+def indexes_for(collection):
+    # Every collection has the implicit _id index
+    return [[("_id", ASCENDING)]] + [keys for keys, _ in INDEX_SPEC.get(collection, [])]
+
+def supports(keys, query, sort):
+    """
+    Whether an index on `keys` serves `query` and `sort` without a blocking
+    sort: equality fields first (any order), then the sort keys in index
+    order or fully reversed. Without a sort, range fields must follow the
+    equality fields; with one, they are either its leading key or filtered
+    after the index scan.
+    """
+    equality = {field for field, value in query.items() if not isinstance(value, dict) or "$in" in value}
+    ranges = {field for field, value in query.items() if field not in equality}
+    fields = [field for field, _ in keys]
+    if set(fields[:len(equality)]) != equality:
+        return False
+    rest = keys[len(equality):]
+    if not sort:
+        return ranges <= {field for field, _ in rest[:len(ranges)]}
+    same = rest[:len(sort)] == sort
+    reversed_ = rest[:len(sort)] == [(field, -direction) for field, direction in sort]
+    return same or reversed_
+
+def test_every_planned_query_has_an_index():
+    unserved = [
+        (collection, query, sort)
+        for collection, query, sort in QUERY_PLANS
+        if not any(supports(keys, query, sort) for keys in indexes_for(collection))
+    ]
+    assert unserved == []
+
+def test_index_names_are_unique_per_collection():
+    for collection, indexes in INDEX_SPEC.items():
+        names = [options["name"] for _, options in indexes]
+        assert len(names) == len(set(names)), collection
+
+def test_every_index_serves_a_planned_query():
+    # Unique indexes enforce constraints, so they earn their keep regardless
+    unused = [
+        (collection, options["name"])
+        for collection, indexes in INDEX_SPEC.items()
+        for keys, options in indexes
+        if not options.get("unique")
+        and not any(supports(keys, query, sort) for c, query, sort in QUERY_PLANS if c == collection)
+    ]
+    assert unused == []
+
+class FakeCollection:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.created = []
+
+    async def create_index(self, keys, name, **options):
+        if name in self.fail:
+            raise OperationFailure(f"cannot build {name}")
+        self.created.append(name)
+        return name
+
+def test_ensure_indexes_creates_the_spec_and_skips_failures():
+    collections = {"users": FakeCollection(fail={"username_unique"})}
+
+    class FakeDB:
+        def __getitem__(self, name):
+            return collections.setdefault(name, FakeCollection())
+
+    created = asyncio.run(ensure_indexes(FakeDB()))
+
+    assert "users" not in created
+    for collection, indexes in INDEX_SPEC.items():
+        if collection != "users":
+            assert created[collection] == [options["name"] for _, options in indexes]
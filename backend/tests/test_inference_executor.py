@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from app.utils import inference_executor as executor_module
+from app.utils import model_registry
+from app.utils.inference_executor import InferenceExecutor
+from app.utils.prediction import FEATURES, MODEL_FEATURE_COUNT, ModelBundle, ModelHandler
+
+def make_bundle(version="v1"):
+    rows = pd.DataFrame(np.random.default_rng(0).normal(size=(100, len(FEATURES))), columns=FEATURES)
+    scaler = StandardScaler().fit(rows)
+    X = scaler.transform(rows)[:, :MODEL_FEATURE_COUNT]
+    model = RandomForestClassifier(n_estimators=3, max_depth=2, random_state=0).fit(X, X[:, 0] > 0)
+    return ModelBundle(version, scaler, model, backend="sklearn")
+
+@pytest.fixture
+def handler(monkeypatch):
+    """
+    An unloaded handler that records which thread loads it.
+    """
+    handler = ModelHandler()
+    handler.load_threads = []
+
+    def load_models():
+        handler.load_threads.append(threading.current_thread())
+        handler.swap(make_bundle())
+
+    monkeypatch.setattr(handler, "load_models", load_models)
+    monkeypatch.setattr(executor_module, "model_handler", handler)
+    return handler
+
+@pytest.mark.parametrize("kind", ["inline", "thread"])
+def test_first_prediction_loads_the_model_off_the_event_loop(handler, kind):
+    executor = InferenceExecutor(kind=kind, workers=1)
+
+    async def scenario():
+        return await executor.predict_many(np.zeros((2, len(FEATURES))))
+
+    try:
+        labels, confidences, version = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert version == "v1" and len(labels) == 2
+    assert len(handler.load_threads) == 1
+    assert handler.load_threads[0] is not threading.main_thread()
+
+def test_warm_up_loads_the_model_off_the_event_loop(handler):
+    executor = InferenceExecutor(kind="thread", workers=1)
+    try:
+        asyncio.run(executor.warm_up())
+    finally:
+        executor.shutdown()
+
+    assert handler.loaded
+    assert handler.load_threads[0] is not threading.main_thread()
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "MODEL_REGISTRY_DIR", tmp_path)
+    monkeypatch.setattr(model_registry, "ACTIVE_POINTER_PATH", tmp_path / "active.json")
+    for version in ["v1", "v2"]:
+        (tmp_path / version).mkdir()
+        (tmp_path / version / model_registry.SCALER_FILENAME).touch()
+        (tmp_path / version / model_registry.MODEL_FILENAME).touch()
+    return tmp_path
+
+def test_active_version_follows_the_pointer(registry):
+    assert model_registry.active_version() == model_registry.DEFAULT_VERSION
+    model_registry._write_pointer("v2", ["v1"])
+    assert model_registry.active_version() == "v2"
+    model_registry._write_pointer("v3", ["v2"])
+    assert model_registry.active_version() == model_registry.DEFAULT_VERSION
+
+def test_process_mode_pins_the_registry_version_without_loading(registry, handler, monkeypatch):
+    model_registry._write_pointer("v2", ["v1"])
+    worker = ModelHandler()
+    worker.swap(make_bundle("v2"))
+    monkeypatch.setattr(executor_module, "_worker_handler", worker)
+
+    executor = InferenceExecutor(kind="process", workers=1)
+    # Score in a thread instead of spawning processes; the worker code path is the same
+    executor.pool = ThreadPoolExecutor(max_workers=1)
+    matrix = np.zeros((3, len(FEATURES)))
+
+    async def scenario():
+        first = await executor.predict_many(matrix)
+        second = await executor.predict_many(matrix)
+        return first, second
+
+    try:
+        (_, _, first_version), (_, _, second_version) = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert first_version == second_version == "v2"
+    assert executor.completed == 1
+    assert handler.prediction_cache.hits == 3
+    assert not handler.loaded and handler.load_threads == []
@@ -0,0 +1,120 @@
+import asyncio
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from app.api.v1.endpoints.auth import get_current_operator
+from app.models import User
+from app.utils import model_registry
+from app.utils.prediction import FEATURES, MODEL_FEATURE_COUNT, model_handler
+from app.utils.snapshot_store import snapshot_store
+
+def write_version(registry, version, seed):
+    rng = np.random.default_rng(seed)
+    rows = pd.DataFrame(rng.normal(size=(200, len(FEATURES))), columns=FEATURES)
+    scaler = StandardScaler().fit(rows)
+    X = scaler.transform(rows)[:, :MODEL_FEATURE_COUNT]
+    model = RandomForestClassifier(n_estimators=5, max_depth=3, random_state=seed).fit(X, X[:, 0] > 0)
+    version_dir = registry / version
+    version_dir.mkdir(parents=True)
+    joblib.dump(scaler, version_dir / model_registry.SCALER_FILENAME)
+    joblib.dump(model, version_dir / model_registry.MODEL_FILENAME)
+    model_registry.write_manifest(version)
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "MODEL_REGISTRY_DIR", tmp_path)
+    monkeypatch.setattr(model_registry, "ACTIVE_POINTER_PATH", tmp_path / "active.json")
+    monkeypatch.setattr(model_registry, "MODEL_HOLDOUT_PATH", tmp_path / "holdout.csv")
+    for seed, version in enumerate(["v1", "v2", "v3"]):
+        write_version(tmp_path, version, seed)
+    previous = model_handler.bundle
+    yield tmp_path
+    model_handler.swap(previous)
+
+def read_pointer(registry):
+    return json.loads((registry / "active.json").read_text())
+
+def test_rollback_writes_pointer_while_holding_the_lock(registry, monkeypatch):
+    write_pointer = model_registry._write_pointer
+    locked_during_write = []
+
+    def recording_write_pointer(active, history):
+        locked_during_write.append(model_registry._activation_lock.locked())
+        write_pointer(active, history)
+
+    async def scenario():
+        await model_registry.activate_version("v1")
+        await model_registry.activate_version("v2")
+        monkeypatch.setattr(model_registry, "_write_pointer", recording_write_pointer)
+        return await model_registry.rollback_version()
+
+    result = asyncio.run(scenario())
+
+    assert result["version"] == "v1"
+    assert locked_during_write == [True]
+    assert read_pointer(registry)["active"] == "v1"
+    assert model_handler.version == "v1"
+
+def test_concurrent_rollback_and_activation_leave_pointer_consistent(registry):
+    async def scenario():
+        await model_registry.activate_version("v1")
+        await model_registry.activate_version("v2")
+        await asyncio.gather(model_registry.rollback_version(), model_registry.activate_version("v3"))
+
+    asyncio.run(scenario())
+
+    assert read_pointer(registry)["active"] == model_handler.version
+
+def test_rollback_without_history_fails(registry):
+    with pytest.raises(model_registry.ModelValidationError):
+        asyncio.run(model_registry.rollback_version())
+
+def test_sync_picks_up_other_workers_version_and_invalidates_explain(registry):
+    async def scenario():
+        await model_registry.activate_version("v1")
+        # Another worker activates v2 through the shared pointer
+        model_registry._write_pointer("v2", ["v1"])
+        generation = snapshot_store.generations.get("explain", 0)
+        await model_registry.sync_active_version()
+        return generation
+
+    generation = asyncio.run(scenario())
+
+    assert model_handler.version == "v2"
+    assert snapshot_store.generations["explain"] == generation + 1
+
+def test_sync_is_a_no_op_when_already_current(registry):
+    async def scenario():
+        await model_registry.activate_version("v1")
+        generation = snapshot_store.generations.get("explain", 0)
+        await model_registry.sync_active_version()
+        return generation
+
+    generation = asyncio.run(scenario())
+
+    assert snapshot_store.generations["explain"] == generation
+
+@pytest.mark.parametrize("user", [
+    User(username="ops", role="operator"),
+    User(username="root", role="admin"),
+    User(username="admin"),
+])
+def test_operators_may_change_the_model(user):
+    assert asyncio.run(get_current_operator(user)) is user
+
+@pytest.mark.parametrize("user", [
+    User(username="analyst", role="analyst"),
+    User(username="viewer"),
+    User(username="ops", role="operator", disabled=True),
+])
+def test_other_users_may_not_change_the_model(user):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_current_operator(user))
+    assert exc.value.status_code == 403
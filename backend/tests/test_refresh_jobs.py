@@ -0,0 +1,223 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import forecast as forecast_endpoint
+from app.utils import forecast_service, scheduler
+from app.utils.forecast_service import RefreshFailed
+from app.utils.zone_catalog import ZoneCatalog
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(scheduler, "REFRESH_RETRY_BACKOFF", 0)
+    monkeypatch.setattr(scheduler, "REFRESH_MAX_RETRIES", 2)
+
+def test_failing_job_is_retried_until_it_succeeds():
+    attempts = 0
+
+    async def job():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise RefreshFailed("upstream down")
+
+    refresher = scheduler.RefreshScheduler()
+    refresher.add_job("job", job, 0)
+
+    async def scenario():
+        return await refresher.trigger("job")
+
+    assert asyncio.run(scenario()) is True
+    status = refresher.jobs["job"].status()
+    assert attempts == 3
+    assert status["lastStatus"] == "ok" and status["failures"] == 2 and status["lastError"] is None
+
+def test_job_that_keeps_failing_is_reported_failed():
+    async def job():
+        raise RefreshFailed("upstream down")
+
+    refresher = scheduler.RefreshScheduler()
+    refresher.add_job("job", job, 0)
+
+    async def scenario():
+        return await refresher.trigger("job")
+
+    assert asyncio.run(scenario()) is False
+    status = refresher.jobs["job"].status()
+    assert status["lastStatus"] == "failed" and status["failures"] == 3
+    assert status["lastError"] == "upstream down"
+
+class FakeDB:
+    # Only reached if a job gets past its upstream fetches
+    def __getattr__(self, name):
+        raise AssertionError(f"unexpected access to {name}")
+
+@pytest.fixture
+def offline_service(monkeypatch):
+    catalog = ZoneCatalog()
+    catalog.build([{"id": "1", "zone": "Old Town", "city": "Delhi", "lat": 28.61, "lng": 77.21}])
+
+    async def ensure_zone_catalog():
+        return catalog
+
+    async def fetch_many(fetch, keys, *args, **kwargs):
+        return {key: {"error": "HTTP error occurred: 503"} for key in keys}
+
+    monkeypatch.setattr(forecast_service, "ensure_zone_catalog", ensure_zone_catalog)
+    monkeypatch.setattr(forecast_service, "fetch_many", fetch_many)
+    monkeypatch.setattr(forecast_service.db_client, "db", FakeDB())
+
+def test_forecast_refresh_fails_when_nothing_was_fetched(offline_service):
+    with pytest.raises(RefreshFailed, match="No forecast data fetched for 1 cities"):
+        asyncio.run(forecast_service.update_forecasts())
+
+def test_refresh_jobs_fail_without_a_database(monkeypatch):
+    monkeypatch.setattr(forecast_service.db_client, "db", None)
+    with pytest.raises(RefreshFailed, match="Database not connected"):
+        asyncio.run(forecast_service.update_forecasts())
+    with pytest.raises(RefreshFailed, match="Database not connected"):
+        asyncio.run(forecast_service.update_risk_zones())
+
+def test_refresh_endpoint_reports_failure(monkeypatch):
+    refresher = scheduler.RefreshScheduler()
+
+    async def job():
+        raise RefreshFailed("No forecast data fetched for 5 cities")
+
+    refresher.add_job("forecasts", job, 0)
+    monkeypatch.setattr(forecast_service, "refresh_scheduler", refresher)
+    monkeypatch.setattr(forecast_endpoint, "refresh_scheduler", refresher)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(forecast_endpoint.refresh_forecasts())
+    assert exc.value.status_code == 500
+    assert exc.value.detail == "No forecast data fetched for 5 cities"
+
+def test_refresh_endpoint_reports_success(monkeypatch):
+    refresher = scheduler.RefreshScheduler()
+
+    async def job():
+        pass
+
+    refresher.add_job("forecasts", job, 0)
+    monkeypatch.setattr(forecast_service, "refresh_scheduler", refresher)
+    monkeypatch.setattr(forecast_endpoint, "refresh_scheduler", refresher)
+
+    assert asyncio.run(forecast_endpoint.refresh_forecasts()) == {"message": "Forecasts updated successfully"}
+
+def test_stale_reads_wait_out_the_cooldown_after_a_failed_refresh(monkeypatch):
+    from starlette.requests import Request
+    from app.utils.snapshot_store import SnapshotStore
+
+    refresher = scheduler.RefreshScheduler()
+    attempts = 0
+
+    async def job():
+        nonlocal attempts
+        attempts += 1
+        raise RefreshFailed("upstream down")
+
+    async def get_forecast_snapshot(horizon):
+        # Nothing published yet, so every read is stale
+        return {"version": None, "updatedAt": None, "items": []}
+
+    refresher.add_job("forecasts", job, 0)
+    monkeypatch.setattr(forecast_service, "refresh_scheduler", refresher)
+    monkeypatch.setattr(forecast_endpoint, "refresh_scheduler", refresher)
+    monkeypatch.setattr(forecast_endpoint, "get_forecast_snapshot", get_forecast_snapshot)
+    monkeypatch.setattr(forecast_endpoint, "snapshot_store", SnapshotStore())
+    request = Request({"type": "http", "method": "GET", "headers": []})
+
+    async def read():
+        response = await forecast_endpoint.serve_forecast_snapshot("24h", request, list)
+        job = refresher.jobs["forecasts"]
+        if job.running:
+            await job.task
+        return response
+
+    async def scenario():
+        await read()
+        await read()
+        # Past the cooldown the next stale read tries again
+        monkeypatch.setattr(forecast_endpoint, "FORECAST_RETRY_COOLDOWN_SECONDS", 0)
+        return await read()
+
+    response = asyncio.run(scenario())
+    assert response.headers["x-forecast-stale"] == "true"
+    # Each failed run made 3 attempts (REFRESH_MAX_RETRIES=2)
+    assert attempts == 6
+
+class FakeCollection:
+    # Just enough of Mongo's upsert semantics for the snapshot pointer
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one_and_update(self, query, update, upsert, return_document):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "value": 0})
+        doc["value"] += update["$inc"]["value"]
+        return dict(doc)
+
+    async def update_one(self, query, update, upsert):
+        from pymongo.errors import DuplicateKeyError
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+        elif doc.get("version", 0) < query["version"]["$lt"]:
+            doc.update(update["$set"])
+        else:
+            raise DuplicateKeyError("E11000 duplicate key error")
+
+    async def insert_one(self, doc):
+        self.docs[doc["_id"]] = doc
+
+    async def delete_many(self, query):
+        cutoff = query["_id"]["$lte"]
+        self.docs = {k: v for k, v in self.docs.items() if k > cutoff}
+
+def test_forecast_pointer_never_moves_backwards():
+    db = type("DB", (), {})()
+    db.forecast_meta, db.forecast_snapshots = FakeCollection(), FakeCollection()
+
+    async def scenario():
+        first = await forecast_service.publish_forecast_snapshot(db, [], [], [])
+        second = await forecast_service.publish_forecast_snapshot(db, [], [], [])
+        # A publisher holding the older version finishes last
+        db.forecast_meta.docs["sequence"]["value"] = first - 1
+        await forecast_service.publish_forecast_snapshot(db, [], [], [])
+        return second
+
+    assert asyncio.run(scenario()) == 2
+    assert db.forecast_meta.docs["current"]["version"] == 2
+
+def test_startup_refresh_makes_a_single_attempt():
+    attempts = 0
+
+    async def job():
+        nonlocal attempts
+        attempts += 1
+        raise RefreshFailed("upstream down")
+
+    refresher = scheduler.RefreshScheduler()
+    refresher.add_job("job", job, 0)
+
+    async def scenario():
+        return await refresher.trigger("job", retries=0)
+
+    assert asyncio.run(scenario()) is False
+    assert attempts == 1
+
+def test_warmup_records_a_failed_initial_refresh():
+    from app.main import initial_refresh
+    from app.utils.warmup import WarmupTracker
+
+    tracker = WarmupTracker()
+
+    async def scenario():
+        ok, failed = asyncio.create_task(asyncio.sleep(0, True)), asyncio.create_task(asyncio.sleep(0, False))
+        with pytest.raises(RuntimeError, match="1 of 2 initial refreshes failed"):
+            await tracker.step("initial_refresh", lambda: initial_refresh([ok, failed]))
+
+    asyncio.run(scenario())
+    assert tracker.steps["initial_refresh"]["status"] == "failed"
+    assert not tracker.complete
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import risk_zones
+from app.api.v1.endpoints.risk_zones import LAT_RANGE, LNG_RANGE, _parse_numbers
+from app.main import app
+from app.models import RiskZone, User
+from app.utils.zone_catalog import zone_catalog
+
+client = TestClient(app)
+
+def test_parses_coordinates_in_range():
+    assert _parse_numbers("47.6,-122.3", "near", [LAT_RANGE, LNG_RANGE]) == [47.6, -122.3]
+    assert _parse_numbers("-90,180", "near", [LAT_RANGE, LNG_RANGE]) == [-90.0, 180.0]
+
+@pytest.mark.parametrize("value", ["nan,0", "0,inf", "-inf,0", "1e999,0", "0", "0,0,0", "a,b", ""])
+def test_rejects_malformed_or_non_finite(value):
+    with pytest.raises(HTTPException) as exc:
+        _parse_numbers(value, "near", [LAT_RANGE, LNG_RANGE])
+    assert exc.value.status_code == 400
+
+@pytest.mark.parametrize("value", ["90.5,0", "-91,0", "0,180.1", "0,-200"])
+def test_rejects_out_of_range(value):
+    with pytest.raises(HTTPException) as exc:
+        _parse_numbers(value, "near", [LAT_RANGE, LNG_RANGE])
+    assert exc.value.status_code == 400
+    assert "outside" in exc.value.detail
+
+@pytest.mark.parametrize("params", [
+    {"near": "nan,10"},
+    {"near": "95,10"},
+    {"near": "10,190"},
+    {"bbox": "-10,-5,10,inf"},
+    {"bbox": "-190,-5,10,5"},
+    {"bbox": "-10,-95,10,5"},
+    {"bbox": "-10,5,10,-5"},
+])
+def test_endpoint_returns_400_for_bad_coordinates(params):
+    response = client.get("/api/v1/risk-zones/", params=params)
+    assert response.status_code == 400
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+
+    def _match(self, query):
+        return [d for d in self.docs if all(d.get(k) == v for k, v in query.items())]
+
+    async def find_one(self, query, projection=None):
+        found = self._match(query)
+        return dict(found[0]) if found else None
+
+    def find(self, query, projection=None):
+        docs = [dict(d) for d in self._match(query)]
+
+        class Cursor:
+            async def to_list(self, length=None):
+                return docs
+        return Cursor()
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def update_one(self, query, update, upsert=False):
+        found = self._match(query)
+        if found:
+            changed = any(found[0].get(k) != v for k, v in update["$set"].items())
+            found[0].update(update["$set"])
+        elif upsert:
+            self.docs.append({**query, **update["$set"]})
+        modified = int(bool(found) and changed)
+        return type("Result", (), {"modified_count": modified})()
+
+    async def delete_one(self, query):
+        found = self._match(query)
+        for doc in found[:1]:
+            self.docs.remove(doc)
+        return type("Result", (), {"deleted_count": len(found[:1])})()
+
+@pytest.fixture
+def zone_db():
+    previous, loaded_at = list(zone_catalog.zones), zone_catalog.loaded_at
+    db = type("DB", (), {})()
+    db.zone_catalog = FakeCollection([
+        {"id": "1", "zone": "Harbor Front", "city": "Mumbai", "population": "12M", "lat": 19.07, "lng": 72.87},
+    ])
+    db.risk_zones = FakeCollection([risk_zone("1", "Harbor Front", 19.07, 72.87)])
+    yield db
+    zone_catalog.build(previous)
+    zone_catalog.loaded_at = loaded_at
+
+def risk_zone(zone_id, name, lat, lng):
+    return {"id": zone_id, "zone": name, "riskLevel": "high", "confidence": 80, "forecast": "24h",
+            "indicators": [], "lat": lat, "lng": lng}
+
+def test_zone_writes_keep_the_catalog_in_step(zone_db):
+    user = User(username="op", email="op@example.com")
+
+    async def scenario():
+        await risk_zones.create_risk_zone(RiskZone(**risk_zone("2", "Old Town", 28.61, 77.21)), zone_db, user)
+        created = [z["id"] for z, _ in zone_catalog.nearest(28.6, 77.2, k=1)]
+        await risk_zones.update_risk_zone("1", RiskZone(**risk_zone("1", "Harbor Front", -33.87, 151.21)), zone_db, user)
+        moved = [z["id"] for z, _ in zone_catalog.nearest(-33.8, 151.2, k=1)]
+        await risk_zones.delete_risk_zone("2", zone_db, user)
+        return created, moved
+
+    created, moved = asyncio.run(scenario())
+
+    assert created == ["2"]
+    assert moved == ["1"]
+    assert [z["id"] for z in zone_catalog.zones] == ["1"]
+    # Catalog-only fields survive the update
+    assert zone_catalog.get("1")["city"] == "Mumbai" and zone_catalog.get("1")["population"] == "12M"
@@ -0,0 +1,24 @@
+import pytest
+from starlette.requests import Request
+
+from app.utils import snapshot_store as snapshot_module
+from app.utils.snapshot_store import EncodedSnapshot
+
+def request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+@pytest.fixture
+def snapshot(monkeypatch):
+    monkeypatch.setattr(snapshot_module, "SNAPSHOT_GZIP_MIN_BYTES", 0)
+    return EncodedSnapshot(b'[{"id": "1"}]', {}, (0, 0))
+
+def test_each_encoding_validates_only_its_own_etag(snapshot):
+    assert snapshot.response(request(if_none_match=snapshot.etag)).status_code == 304
+    assert snapshot.response(request(if_none_match=snapshot.gzip_etag)).status_code == 200
+
+    gzip = dict(accept_encoding="gzip")
+    assert snapshot.response(request(if_none_match=snapshot.gzip_etag, **gzip)).status_code == 304
+    response = snapshot.response(request(if_none_match=snapshot.etag, **gzip))
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip" and response.headers["etag"] == snapshot.gzip_etag
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from app.utils.broadcaster import zone_broadcaster
+from app.utils.forecast_service import publish_zone_changes
+
+def zone(zone_id, **overrides):
+    return {
+        "id": zone_id, "zone": f"Zone {zone_id}", "riskLevel": "high", "confidence": 80,
+        "forecast": "24h", "indicators": ["Heavy Rainfall"], **overrides,
+    }
+
+@pytest.fixture
+def subscriber():
+    subscriber = zone_broadcaster.subscribe()
+    yield subscriber
+    zone_broadcaster.unsubscribe(subscriber)
+
+def events(subscriber):
+    messages = []
+    while not subscriber.queue.empty():
+        messages.append(subscriber.queue.get_nowait())
+    return [json.loads(m.split(b"data: ", 1)[1]) for m in messages]
+
+def test_pushes_changed_zones_in_one_event(subscriber):
+    publish_zone_changes([zone("1"), zone("2", _id="mongo-id")])
+
+    (payload,) = events(subscriber)
+    assert [z["id"] for z in payload] == ["1", "2"]
+    assert "_id" not in payload[1]
+
+def test_legacy_zone_is_skipped_not_fatal(subscriber):
+    legacy = zone("2", confidence="n/a")
+    del legacy["riskLevel"]
+
+    publish_zone_changes([zone("1"), legacy, zone("3")])
+
+    (payload,) = events(subscriber)
+    assert [z["id"] for z in payload] == ["1", "3"]
+
+def test_nothing_is_pushed_without_valid_zones(subscriber):
+    publish_zone_changes([])
+    publish_zone_changes([{"id": "9"}])
+
+    assert events(subscriber) == []